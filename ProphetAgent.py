@@ -1,12 +1,22 @@
 import os
+import json
 import time
+import asyncio
+import aiohttp
 import requests
 import xml.etree.ElementTree as ET
-from web3 import Web3
+from web3 import Web3, AsyncWeb3
+from web3.exceptions import TransactionNotFound
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import pytz
 
+from team_index import TeamIndex, TEAM_INDEX_FILE
+from fixture_index import FixtureIndex, FIXTURE_INDEX_FILE, FIXTURE_PENDING_TIMEOUT
+from resolution_queue import ResolutionQueue, WorkBudget
+from cassette import Cassette
+from market_reader import MarketReader, MARKET_ABI, DESCRIPTIONS_FILE, REFRESH_MAX_CHUNKS
+
 # Load environment variables
 if os.path.exists('./frontend/.env.local'):
     load_dotenv(dotenv_path='./frontend/.env.local')
@@ -17,19 +27,62 @@ RPC_URL = os.getenv('VITE_ARC_RPC_URL', 'https://rpc.testnet.arc.network')
 CONTRACT_ADDRESS = os.getenv('VITE_CONTRACT_ADDRESS', '').replace('"', '').replace("'", "").strip()
 PRIVATE_KEY = os.getenv('PRIVATE_KEY', '').replace('"', '').replace("'", "").strip()
 
+# Execution mode: 'sync' (RealOracleAgent) or 'async' (AsyncOracleAgent)
+AGENT_MODE = os.getenv('AGENT_MODE', 'sync').strip().lower()
+RPC_CONCURRENCY = int(os.getenv('RPC_CONCURRENCY', '16'))
+HTTP_CONCURRENCY = int(os.getenv('HTTP_CONCURRENCY', '4'))
+TX_CONCURRENCY = int(os.getenv('TX_CONCURRENCY', '4'))
+
 # Headers to prevent bot detection
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
     'Accept': 'application/json'
 }
 
+# Major leagues to monitor (TheSportsDB IDs)
+FOOTBALL_LEAGUES = {
+    'English Premier League': '4328',
+    'Spanish La Liga': '4335',
+    'Italian Serie A': '4332',
+    'German Bundesliga': '4331',
+    'French Ligue 1': '4334'
+}
+
+# New football markets per cycle (discovery itself covers every league in FOOTBALL_LEAGUES)
+FOOTBALL_MARKETS_PER_CYCLE = int(os.getenv('FOOTBALL_MARKETS_PER_CYCLE', '10'))
+
+# Team alias lists are re-seeded from TheSportsDB once a week
+TEAM_INDEX_MAX_AGE = 7 * 86400
+# football_result() sentinel: team names could not be mapped to TheSportsDB teams
+UNMATCHED = 'UNMATCHED'
+
+# Resolution queue tuning (budgets themselves live in resolution_queue.py)
+EARLY_WIN_READINESS = 0.3  # priority factor for live crypto markets (early-win check only)
+FOOTBALL_RESOLVE_ATTEMPTS = 3
+# Worst-case API requests per oracle lookup: held by drain(), charged per request actually made
+# (football: event lookup + name search per attempt, crypto: early-win price + expiry re-fetch)
+ORACLE_API_COST = {'football': 2 * FOOTBALL_RESOLVE_ATTEMPTS, 'crypto': 2, 'stock': 0}
+RPC_PER_TX = 4  # nonce + gas price + chain id + send
+RESOLVE_SCAN_WINDOW = 200  # newest markets scanned for resolution
+
 # Optional: Add API keys for better data sources
 FOOTBALL_API_KEY = os.getenv('FOOTBALL_API_KEY', '3')  # TheSportsDB test key
 CMC_API_KEY = os.getenv('CMC_API_KEY', '').replace('"', '').replace("'", "").strip()
 
-ABI = [
-    {"inputs":[],"name":"marketCount","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},
-    {"inputs":[{"internalType":"uint256","name":"","type":"uint256"}],"name":"markets","outputs":[{"internalType":"string","name":"description","type":"string"},{"internalType":"string","name":"category","type":"string"},{"internalType":"uint256","name":"totalYes","type":"uint256"},{"internalType":"uint256","name":"totalNo","type":"uint256"},{"internalType":"bool","name":"resolved","type":"bool"},{"internalType":"bool","name":"result","type":"bool"},{"internalType":"uint256","name":"deadline","type":"uint256"},{"internalType":"bool","name":"exists","type":"bool"}],"stateMutability":"view","type":"function"},
+# Crypto price targets: (symbol, name, volatility)
+CRYPTO_ASSETS = [
+    ('BTC', 'Bitcoin', 0.015),    # +1.5% target
+    ('ETH', 'Ethereum', 0.020),   # +2.0% target
+    ('SOL', 'Solana', 0.025)      # +2.5% target
+]
+
+CMC_QUOTES_URL = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/quotes/latest"
+CMC_HEADERS = {
+    'Accepts': 'application/json',
+    'X-CMC_PRO_API_KEY': CMC_API_KEY,
+}
+
+ABI = MARKET_ABI + [
     {"inputs":[{"internalType":"uint256","name":"marketId","type":"uint256"},{"internalType":"bool","name":"result","type":"bool"}],"name":"resolveMarket","outputs":[],"stateMutability":"nonpayable","type":"function"},
     {"inputs":[{"internalType":"string","name":"description","type":"string"},{"internalType":"string","name":"category","type":"string"},{"internalType":"uint256","name":"duration","type":"uint256"}],"name":"createMarket","outputs":[],"stateMutability":"nonpayable","type":"function"}
 ]
@@ -44,24 +97,60 @@ class RealOracleAgent:
     """
     
     def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider(RPC_URL))
-        self.account = self.w3.eth.account.from_key(PRIVATE_KEY)
+        # Record/replay of every HTTP + RPC call (AGENT_CASSETTE, see cassette.py)
+        state_files = {'team_index': TEAM_INDEX_FILE, 'fixture_index': FIXTURE_INDEX_FILE,
+                       'market_descriptions': DESCRIPTIONS_FILE}
+        self.cassette = Cassette.from_env(
+            state_files=state_files,
+            meta={'contract': CONTRACT_ADDRESS, 'agent_mode': AGENT_MODE},
+            secrets=[FOOTBALL_API_KEY, CMC_API_KEY]
+        )
+        self.contract_address = CONTRACT_ADDRESS
+        if self.cassette:
+            state_files = self.cassette.state_files
+            if self.cassette.replaying:
+                self.contract_address = self.cassette.meta.get('contract') or CONTRACT_ADDRESS
+        
+        self.w3 = Web3(self.cassette.web3_provider(RPC_URL) if self.cassette else Web3.HTTPProvider(RPC_URL))
+        if self.cassette and self.cassette.replaying and not PRIVATE_KEY:
+            # Offline replay does not need the production key (tx nonces/sends are matched by method)
+            self.account = self.w3.eth.account.create()
+        else:
+            self.account = self.w3.eth.account.from_key(PRIVATE_KEY)
         self.contract = self.w3.eth.contract(
-            address=self.w3.to_checksum_address(CONTRACT_ADDRESS), 
+            address=self.w3.to_checksum_address(self.contract_address), 
             abi=ABI
         )
+        # Market rows in the deployed contract's layout (v1 getter or v2 getMarket + MarketCreated)
+        self.markets = MarketReader(self.w3, self.contract_address, state_files['market_descriptions'])
         
         # Session for requests with headers
-        self.session = requests.Session()
+        self.session = self.cassette.session() if self.cassette else requests.Session()
         self.session.headers.update(HEADERS)
         
+        self.team_index = TeamIndex(state_files['team_index'])
+        # Market id where the last budget-limited resolution scan stopped
+        self.scan_cursor = None
+        self.fixture_index = FixtureIndex(state_files['fixture_index'])
+        
         print(f"🔮 Real Oracle Agent ACTIVE")
         print(f"📍 Agent Address: {self.account.address}")
-        print(f"📍 Contract: {CONTRACT_ADDRESS}")
+        print(f"📍 Contract: {self.contract_address}")
+    
+    def now(self):
+        """Unix time (the recorded time when replaying a cassette)"""
+        return self.cassette.time() if self.cassette else time.time()
+    
+    def sleep(self, seconds, idle=False):
+        """time.sleep, skipped by cassette replay (idle = wait between cycles)"""
+        if self.cassette:
+            self.cassette.sleep(seconds, idle)
+        else:
+            time.sleep(seconds)
         
     # ==================== FOOTBALL ORACLE ====================
     
-    def fetch_live_football_fixtures(self, max_fixtures=5):
+    def fetch_live_football_fixtures(self, max_fixtures=None):
         """
         Fetch real upcoming football matches from TheSportsDB API
         """
@@ -69,18 +158,9 @@ class RealOracleAgent:
             fixtures = []
             seen_event_ids = set()
             
-            # Major leagues to monitor (TheSportsDB IDs)
-            leagues = {
-                'English Premier League': '4328',
-                'Spanish La Liga': '4335',
-                'Italian Serie A': '4332',
-                'German Bundesliga': '4331',
-                'French Ligue 1': '4334'
-            }
-            
             print(f"📡 Fetching football fixtures from TheSportsDB...")
             
-            for league_name, league_id in leagues.items():
+            for league_name, league_id in FOOTBALL_LEAGUES.items():
                 try:
                     url = f"https://www.thesportsdb.com/api/v1/json/{FOOTBALL_API_KEY}/eventsnextleague.php?id={league_id}"
                     r = self.session.get(url, timeout=10)
@@ -89,39 +169,12 @@ class RealOracleAgent:
                         print(f"   ⚠️ TheSportsDB Blocked {league_name} (Status {r.status_code})")
                         continue
                         
-                    data = r.json()
+                    self.collect_fixtures(r.json(), league_name, fixtures, seen_event_ids, max_fixtures)
                     
-                    if data and data.get('events'):
-                        print(f"   ✅ Found {len(data['events'])} events for {league_name}")
-                        for event in data['events']:
-                            event_id = event['idEvent']
-                            
-                            if event_id in seen_event_ids:
-                                continue
-                            
-                            try:
-                                # Use ACTUAL league from API for correct labeling
-                                actual_league = event.get('strLeague', league_name)
-                                
-                                fixtures.append({
-                                    'home': event['strHomeTeam'],
-                                    'away': event['strAwayTeam'],
-                                    'league': actual_league,
-                                    'date': event['dateEvent'],
-                                    'time': event.get('strTime') or '22:00:00', # Default to late evening if time missing
-                                    'event_id': event_id
-                                })
-                                seen_event_ids.add(event_id)
-                                
-                                if len(fixtures) >= max_fixtures:
-                                    break
-                            except:
-                                continue
-                    
-                    if len(fixtures) >= max_fixtures:
+                    if max_fixtures and len(fixtures) >= max_fixtures:
                         break
                     
-                    time.sleep(1) # Rate limit
+                    self.sleep(1) # Rate limit
                 except Exception as e:
                     print(f"   ❌ Error fetching {league_name}: {e}")
             
@@ -131,78 +184,153 @@ class RealOracleAgent:
             print(f"❌ Football API Error: {e}")
             return []
 
-    def resolve_football_match(self, home_team, away_team, target_team, event_id=None):
+    def collect_fixtures(self, data, league_name, fixtures, seen_event_ids, max_fixtures=None):
+        """Append upcoming events from an eventsnextleague.php payload to fixtures"""
+        if data and data.get('events'):
+            print(f"   ✅ Found {len(data['events'])} events for {league_name}")
+            for event in data['events']:
+                event_id = event['idEvent']
+                self.team_index.learn_event(event)
+                
+                if event_id in seen_event_ids:
+                    continue
+                
+                try:
+                    # Use ACTUAL league from API for correct labeling
+                    actual_league = event.get('strLeague', league_name)
+                    
+                    fixtures.append({
+                        'home': event['strHomeTeam'],
+                        'away': event['strAwayTeam'],
+                        'league': actual_league,
+                        'date': event['dateEvent'],
+                        'time': event.get('strTime') or '22:00:00', # Default to late evening if time missing
+                        'event_id': event_id
+                    })
+                    seen_event_ids.add(event_id)
+                    
+                    if max_fixtures and len(fixtures) >= max_fixtures:
+                        break
+                except:
+                    continue
+
+    def resolve_football_match(self, home_team, away_team, target_team, event_id=None, market_id=None, credits=None):
         """
         Resolve football match using TheSportsDB data with Retry logic
+        credits (resolution_queue.Allowance) is charged once per request
         """
-        max_retries = 2
+        max_retries = FOOTBALL_RESOLVE_ATTEMPTS - 1
         for attempt in range(max_retries + 1):
             try:
                 print(f"   🔍 Checking match: {home_team} vs {away_team} (Target: {target_team})")
-                
-                def check_win(h_score, a_score, h_name, a_name):
-                    # Normalize names for better matching
-                    h_name = h_name.lower()
-                    a_name = a_name.lower()
-                    target = target_team.lower()
-                    
-                    if target in h_name:
-                        return h_score > a_score
-                    elif target in a_name:
-                        return a_score > h_score
-                    return False
 
                 # Method 1: Use Event ID
                 if event_id:
                     url = f"https://www.thesportsdb.com/api/v1/json/{FOOTBALL_API_KEY}/lookupevent.php?id={event_id}"
+                    if credits:
+                        credits.charge()
                     r = self.session.get(url, timeout=10)
                     if r.status_code == 200:
                         data = r.json()
                         if data and data.get('events'):
-                            event = data['events'][0]
-                            if event.get('strStatus') == 'Match Finished':
-                                h_s = int(event.get('intHomeScore', 0))
-                                a_s = int(event.get('intAwayScore', 0))
-                                print(f"   ⚽ Result: {event['strHomeTeam']} {h_s}-{a_s} {event['strAwayTeam']}")
-                                return check_win(h_s, a_s, event['strHomeTeam'], event['strAwayTeam'])
+                            result = self.football_result(data['events'][:1], home_team, away_team, target_team)
+                            if result is not None and result is not UNMATCHED:
+                                return self.settle_football_result(market_id, result, home_team, away_team)
 
                 # Method 2: Search by Names
-                home_norm = home_team.replace(' ', '_')
-                away_norm = away_team.replace(' ', '_')
-                url = f"https://www.thesportsdb.com/api/v1/json/{FOOTBALL_API_KEY}/searchevents.php?e={home_norm}_vs_{away_norm}"
-                r = self.session.get(url, timeout=10)
+                events = []
+                if credits:
+                    credits.charge()
+                r = self.session.get(self.search_events_url(home_team, away_team), timeout=10)
                 if r.status_code == 200:
                     data = r.json()
                     if data and data.get('event'):
-                        for event in data['event']:
-                            if event.get('strStatus') == 'Match Finished':
-                                h_s = int(event.get('intHomeScore', 0))
-                                a_s = int(event.get('intAwayScore', 0))
-                                print(f"   ⚽ Result: {event['strHomeTeam']} {h_s}-{a_s} {event['strAwayTeam']}")
-                                return check_win(h_s, a_s, event['strHomeTeam'], event['strAwayTeam'])
+                        events = data['event']
 
-                return None
+                result = self.football_result(events, home_team, away_team, target_team)
+                return self.settle_football_result(market_id, result, home_team, away_team)
             except Exception as e:
                 if attempt < max_retries:
                     print(f"   ⚠️ Football Resolution Attempt {attempt+1} failed ({e}). Retrying...")
-                    time.sleep(2)
+                    self.sleep(2)
                 else:
                     print(f"   ❌ Football Resolution Error: {e}")
                     return None
     
+    def search_events_url(self, home_team, away_team):
+        # Query with canonical TheSportsDB names ("Man City" -> "Manchester City")
+        home_norm = self.team_index.canonical(home_team).replace(' ', '_')
+        away_norm = self.team_index.canonical(away_team).replace(' ', '_')
+        return f"https://www.thesportsdb.com/api/v1/json/{FOOTBALL_API_KEY}/searchevents.php?e={home_norm}_vs_{away_norm}"
+
+    def football_result(self, events, home_team, away_team, target_team):
+        """
+        Result for target_team from the first finished event between home_team and away_team
+        Teams are compared by TheSportsDB id through the team index
+        Returns: True/False, None if not finished yet, UNMATCHED if the names map to no known team
+        """
+        for event in events:
+            self.team_index.learn_event(event)
+        
+        home_id = self.team_index.lookup(home_team)
+        away_id = self.team_index.lookup(away_team)
+        target_id = self.team_index.lookup(target_team)
+        if home_id is None or away_id is None or target_id not in (home_id, away_id):
+            return UNMATCHED
+        
+        for event in events:
+            if {event.get('idHomeTeam'), event.get('idAwayTeam')} != {home_id, away_id}:
+                continue
+            if event.get('strStatus') != 'Match Finished':
+                continue
+            h_s = int(event.get('intHomeScore', 0))
+            a_s = int(event.get('intAwayScore', 0))
+            print(f"   ⚽ Result: {event['strHomeTeam']} {h_s}-{a_s} {event['strAwayTeam']}")
+            
+            if event['idHomeTeam'] == target_id:
+                return h_s > a_s
+            return a_s > h_s
+        return None
+
+    def settle_football_result(self, market_id, result, home_team, away_team):
+        """Flag markets whose teams are unknown so they are not refetched every cycle"""
+        if result is UNMATCHED:
+            print(f"   🚩 Unmatched team names: {home_team} vs {away_team} - flagged until the team index grows")
+            if market_id is not None:
+                self.team_index.flag_unmatched(market_id, [home_team, away_team])
+            return None
+        if market_id is not None:
+            self.team_index.clear_flag(market_id)
+        return result
+
+    def refresh_team_index(self):
+        """Seed aliases (strTeamAlternate, strTeamShort) for every monitored league, weekly"""
+        for league_name, league_id in FOOTBALL_LEAGUES.items():
+            if not self.team_index.league_is_stale(league_id, TEAM_INDEX_MAX_AGE, self.now()):
+                continue
+            try:
+                url = f"https://www.thesportsdb.com/api/v1/json/{FOOTBALL_API_KEY}/lookup_all_teams.php?id={league_id}"
+                r = self.session.get(url, timeout=10)
+                if r.status_code != 200:
+                    print(f"   ⚠️ Team list unavailable for {league_name} (Status {r.status_code})")
+                    continue
+                for team in (r.json() or {}).get('teams') or []:
+                    self.team_index.learn_team(team)
+                self.team_index.mark_league_seeded(league_id, self.now())
+            except Exception as e:
+                print(f"   ⚠️ Team index refresh failed for {league_name}: {e}")
+        self.team_index.save()
+    
     # ==================== CRYPTO ORACLE ====================
     
-    def get_crypto_price(self, symbol):
+    def get_crypto_price(self, symbol, credits=None):
         """Get real-time crypto price from CoinMarketCap exclusively"""
         if CMC_API_KEY:
             try:
-                url = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/quotes/latest"
                 params = {'symbol': symbol, 'convert': 'USD'}
-                headers = {
-                    'Accepts': 'application/json',
-                    'X-CMC_PRO_API_KEY': CMC_API_KEY,
-                }
-                r = requests.get(url, params=params, headers=headers, timeout=10)
+                if credits:
+                    credits.charge()
+                r = self.session.get(CMC_QUOTES_URL, params=params, headers=CMC_HEADERS, timeout=10)
                 if r.status_code == 200:
                     data = r.json()
                     price = data['data'][symbol]['quote']['USD']['price']
@@ -216,14 +344,15 @@ class RealOracleAgent:
             
         return None
     
-    def resolve_crypto_target(self, symbol, target_price):
+    def resolve_crypto_target(self, symbol, target_price, data=None, credits=None):
         """
         Final check for crypto target using current CMC price (no history)
+        Pass data to reuse a price already fetched this pass
         Returns: True if current price >= target, False otherwise
         """
         try:
             print(f"   🔍 Resolving {symbol} via CMC (Current Price Check)...")
-            data = self.get_crypto_price(symbol)
+            data = data or self.get_crypto_price(symbol, credits)
             if data:
                 current_price = data['current_price']
                 result = current_price >= target_price
@@ -244,10 +373,11 @@ class RealOracleAgent:
             
             # Check last 100 markets (or all if less)
             start = max(1, count - 99)
+            self.markets.refresh()
             
             for i in range(start, count + 1):
                 try:
-                    m = self.contract.functions.markets(i).call()
+                    m = self.markets.read(i)
                     if not m[4]:  # Not resolved
                         active.append({
                             'id': i,
@@ -266,44 +396,101 @@ class RealOracleAgent:
     
     def create_football_markets(self):
         """Create markets for real upcoming matches"""
-        fixtures = self.fetch_live_football_fixtures(max_fixtures=5)
-        active = self.get_active_markets()
-        active_descs = {m['description'] for m in active}
+        self.settle_fixture_markets()
+        fixtures = self.fetch_live_football_fixtures()
+        if not self.fixture_index.seeded:
+            self.seed_fixture_index(fixtures, self.get_active_markets())
         
         created = 0
+        for fixture, desc, duration in self.select_new_fixtures(fixtures):
+            try:
+                tx_hash = self.deploy_market(desc, "Football", duration)
+                if tx_hash:
+                    self.fixture_index.record(fixture, tx_hash, now=self.now())
+                    print(f"⚽ Created: {fixture['home']} vs {fixture['away']}")
+                    created += 1
+                    self.sleep(2)  # Prevent nonce collision
+            except Exception as e:
+                print(f"❌ Error creating football market: {e}")
+        
+        self.fixture_index.save(self.now())
+        return created
+    
+    def select_new_fixtures(self, fixtures):
+        """
+        Dedupe fixtures against the fixture index (no chain reads) and keep those still
+        open for betting, up to FOOTBALL_MARKETS_PER_CYCLE
+        Returns: [(fixture, description, duration)]
+        """
+        selected = []
         for fixture in fixtures:
-            desc = f"Football: {fixture['home']} vs {fixture['away']} ({fixture['league']}) - Will {fixture['home']} win?"
-            
             # Skip if already exists
-            if desc in active_descs:
+            if self.fixture_index.contains(fixture):
                 print(f"⏭️  Skipping duplicate: {fixture['home']} vs {fixture['away']}")
                 continue
             
             try:
-                # Use UTC for duration calculation to match API data
-                now_utc = datetime.now(pytz.UTC)
-                # Standardize match time parsing
-                clean_time = fixture['time'].split('+')[0].strip() # Handle '15:00:00+00:00'
-                match_datetime = pytz.UTC.localize(datetime.strptime(
-                    f"{fixture['date']} {clean_time}", 
-                    '%Y-%m-%d %H:%M:%S'
-                ))
-                
-                # Market should end 3 hours after start (covering match duration + buffer)
-                duration = int((match_datetime + timedelta(hours=3) - now_utc).total_seconds())
-                
-                if duration > 0:
-                    self.deploy_market(desc, "Football", duration)
-                    print(f"⚽ Created: {fixture['home']} vs {fixture['away']}")
-                    created += 1
-                    time.sleep(2)  # Prevent nonce collision
-                else:
-                    print(f"⏭️  Match already started: {fixture['home']} vs {fixture['away']}")
-                    
+                duration = self.football_market_duration(fixture)
             except Exception as e:
                 print(f"❌ Error creating football market: {e}")
-        
-        return created
+                continue
+            
+            if duration <= 0:
+                print(f"⏭️  Match already started: {fixture['home']} vs {fixture['away']}")
+                continue
+            
+            if len(selected) >= FOOTBALL_MARKETS_PER_CYCLE:
+                print(f"⏭️  {FOOTBALL_MARKETS_PER_CYCLE} new football markets this cycle, rest left for next cycle")
+                break
+            selected.append((fixture, self.football_market_description(fixture), duration))
+        return selected
+    
+    def settle_fixture_markets(self):
+        """
+        Check receipts of createMarket txs sent in earlier cycles: mined ones are confirmed,
+        reverted ones and ones still unknown after FIXTURE_PENDING_TIMEOUT (dropped/replaced)
+        are removed from the fixture index so the fixture gets a market next time
+        """
+        for tx_hash, created_at in self.fixture_index.pending():
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                if self.now() - created_at > FIXTURE_PENDING_TIMEOUT:
+                    print(f"⚠️ createMarket tx {tx_hash} not mined after {FIXTURE_PENDING_TIMEOUT}s, fixture will be retried")
+                    self.fixture_index.settle(tx_hash, mined=False)
+                continue
+            except Exception as e:
+                print(f"❌ Error checking createMarket tx {tx_hash}: {e}")
+                continue
+            if receipt['status'] == 1:
+                self.fixture_index.settle(tx_hash, mined=True)
+            else:
+                print(f"⚠️ createMarket tx {tx_hash} reverted, fixture will be retried")
+                self.fixture_index.settle(tx_hash, mined=False)
+    
+    def seed_fixture_index(self, fixtures, active):
+        """One-time import of fixtures that already have a market (created before the index existed)"""
+        active_descs = {m['description'] for m in active}
+        for fixture in fixtures:
+            if self.football_market_description(fixture) in active_descs:
+                self.fixture_index.record(fixture)
+        self.fixture_index.mark_seeded()
+        print(f"📇 Fixture index seeded from {len(active)} active markets")
+    
+    def football_market_description(self, fixture):
+        return f"Football: {fixture['home']} vs {fixture['away']} ({fixture['league']}) - Will {fixture['home']} win?"
+
+    def football_market_duration(self, fixture):
+        """Seconds from now until 3 hours after kick-off (covering match duration + buffer)"""
+        # Use UTC for duration calculation to match API data
+        now_utc = datetime.fromtimestamp(self.now(), pytz.UTC)
+        # Standardize match time parsing
+        clean_time = fixture['time'].split('+')[0].strip() # Handle '15:00:00+00:00'
+        match_datetime = pytz.UTC.localize(datetime.strptime(
+            f"{fixture['date']} {clean_time}", 
+            '%Y-%m-%d %H:%M:%S'
+        ))
+        return int((match_datetime + timedelta(hours=3) - now_utc).total_seconds())
     
     def create_crypto_markets(self):
         """Create markets for crypto price targets"""
@@ -312,14 +499,8 @@ class RealOracleAgent:
         # FIX: Check by category AND symbol to prevent duplicates
         active_crypto = [m for m in active if m['category'] == 'Crypto']
         
-        assets = [
-            ('BTC', 'Bitcoin', 0.015),    # +1.5% target
-            ('ETH', 'Ethereum', 0.020),   # +2.0% target
-            ('SOL', 'Solana', 0.025)      # +2.5% target
-        ]
-        
         created = 0
-        for symbol, name, volatility in assets:
+        for symbol, name, volatility in CRYPTO_ASSETS:
             try:
                 # Check if this symbol already has an active market
                 has_active = any(f"({symbol})" in m['description'] for m in active_crypto)
@@ -335,20 +516,22 @@ class RealOracleAgent:
                     continue
                 
                 current_price = data['current_price']
-                target = round(current_price * (1 + volatility), 2)
-                
-                desc = f"Crypto: Will {name} ({symbol}) reach ${target:.2f} in next 6 hours? (Current: ${current_price:.2f})"
+                target, desc = self.crypto_market_description(symbol, name, volatility, current_price)
                 
                 self.deploy_market(desc, "Crypto", 21600)  # 6 hours
                 print(f"₿ Created {symbol} market: ${current_price:.2f} → ${target:.2f}")
                 created += 1
-                time.sleep(2)
+                self.sleep(2)
                 
             except Exception as e:
                 print(f"❌ Error creating {symbol} market: {e}")
         
         return created
     
+    def crypto_market_description(self, symbol, name, volatility, current_price):
+        target = round(current_price * (1 + volatility), 2)
+        return target, f"Crypto: Will {name} ({symbol}) reach ${target:.2f} in next 6 hours? (Current: ${current_price:.2f})"
+    
     def deploy_market(self, description, category, duration):
         """Deploy a single market to blockchain"""
         try:
@@ -366,14 +549,16 @@ class RealOracleAgent:
                 'chainId': self.w3.eth.chain_id
             })
             
-            signed = self.w3.eth.account.sign_transaction(tx, PRIVATE_KEY)
+            signed = self.w3.eth.account.sign_transaction(tx, self.account.key)
             raw = getattr(signed, 'raw_transaction', getattr(signed, 'rawTransaction', None))
             tx_hash = self.w3.eth.send_raw_transaction(raw)
             
             print(f"   ✅ TX: {tx_hash.hex()}")
+            return tx_hash.hex()
             
         except Exception as e:
             print(f"   ❌ Deploy error: {e}")
+            return None
     
     # ==================== MARKET RESOLUTION ====================
     
@@ -435,87 +620,169 @@ class RealOracleAgent:
         
         return None
     
+    def oracle_readiness(self, market_id, details, is_expired):
+        """How likely an oracle lookup is to produce a result right now (0 = skip)"""
+        market_type = details['type']
+        if market_type == 'football':
+            if self.team_index.is_flagged(market_id):
+                print(f"   🚩 Market #{market_id} skipped (unmatched team names)")
+                return 0
+            # Deadline is kick-off + 3h, so there is no final score before it
+            return 1.0 if is_expired else 0
+        if market_type == 'crypto':
+            # Live markets can still resolve early if the target is hit
+            return 1.0 if is_expired else EARLY_WIN_READINESS
+        # Stocks not implemented yet
+        return 0
+    
+    def enqueue_market(self, queue, market_id, m, now):
+        """Score one market row (MarketReader, v1 shape) into the resolution queue"""
+        description, category, total_yes, total_no, resolved, _, deadline, _ = m
+        if resolved:
+            return
+        
+        details = self.parse_market_details(description, category)
+        if not details:
+            return
+        
+        is_expired = now > deadline
+        readiness = self.oracle_readiness(market_id, details, is_expired)
+        queue.push(market_id, total_yes + total_no, now - deadline, readiness, ORACLE_API_COST[details['type']], {
+            'description': description,
+            'details': details,
+            'is_expired': is_expired
+        })
+    
+    def refresh_markets(self, budget, rpc_reserve=0):
+        """
+        Index new MarketCreated logs with the RPC calls left in budget (keeping rpc_reserve back)
+        and charge them to it; a cold index catches up over the next cycles
+        """
+        available = budget.available('rpc', rpc_reserve)
+        max_chunks = REFRESH_MAX_CHUNKS if available is None else min(REFRESH_MAX_CHUNKS, available - 1)
+        if max_chunks < 0:
+            return
+        budget.charge('rpc', self.markets.refresh(max_chunks=max_chunks))
+    
+    def scan_market_ids(self, count):
+        """
+        Ids of the newest RESOLVE_SCAN_WINDOW markets, newest first, rotated to start where
+        the last budget-limited scan stopped so the oldest (most overdue) ones are reached
+        """
+        oldest = max(1, count - RESOLVE_SCAN_WINDOW + 1)
+        market_ids = list(range(count, oldest - 1, -1))
+        cursor = self.scan_cursor
+        self.scan_cursor = None
+        if cursor is not None and oldest <= cursor <= count:
+            start = count - cursor
+            market_ids = market_ids[start:] + market_ids[:start]
+        return market_ids
+    
+    def stop_scan(self, market_id):
+        """RPC budget ran out before market_id: the next cycle's scan starts there"""
+        print(f"   ⚠️ RPC budget reached, scan stopped at market #{market_id} (resumes there next cycle)")
+        self.scan_cursor = market_id
+    
     def resolve_expired_markets(self):
-        """Scan and resolve expired markets using real oracles"""
+        """
+        Scan unresolved markets into a priority queue, then resolve the most valuable
+        ones first within this cycle's WorkBudget. The rest is deferred to the next cycle.
+        """
         try:
+            budget = WorkBudget()
             count = self.contract.functions.marketCount().call()
-            now = int(time.time())
+            budget.spend('rpc')
+            now = int(self.now())
+            
+            # Keep enough RPC calls back to send the txs of this cycle
+            rpc_reserve = budget.rpc_reserve(RPC_PER_TX)
+            self.refresh_markets(budget, rpc_reserve)
             
             print(f"\n🔍 Scanning {count} markets for resolution...", flush=True)
             
+            queue = ResolutionQueue()
+            
+            for market_id in self.scan_market_ids(count):
+                if not budget.spend('rpc', reserve=rpc_reserve):
+                    self.stop_scan(market_id)
+                    break
+                try:
+                    m = self.markets.read(market_id)
+                    self.enqueue_market(queue, market_id, m, now)
+                except Exception as e:
+                    print(f"   ❌ Error on market #{market_id}: {e}")
+            
+            print(f"   📋 Queue: {len(queue)} resolvable, {queue.not_ready} waiting for oracle data")
+            
             resolved_count = 0
+            deferred = 0
             
-            # Scan backwards from newest to oldest - INCREASED RANGE TO 200
-            for market_id in range(count, max(0, count - 200), -1): 
+            for market_id, score, credits, item in queue.drain(budget):
+                # drain() holds the lookup's API credits and one tx until they are settled below
+                tx_held = True
                 try:
-                    m = self.contract.functions.markets(market_id).call()
-                    
-                    description = m[0]
-                    category = m[1]
-                    resolved = m[4]
-                    deadline = m[6]
-                    
-                    # Skip if already resolved
-                    if resolved:
-                        continue
-                    
-                    # Check if expired
-                    is_expired = now > deadline
-                    
-                    # Parse market details
-                    details = self.parse_market_details(description, category)
-                    if not details:
-                        continue
-                    
+                    details = item['details']
+                    is_expired = item['is_expired']
                     result = None
                     market_type = details['type']
                     
                     # Try to resolve based on type
                     if market_type == 'football':
-                        print(f"\n🎯 Market #{market_id} (Football)")
+                        print(f"\n🎯 Market #{market_id} (Football) [priority {score:.1f}]")
                         result = self.resolve_football_match(
                             details['home'],
                             details['away'],
-                            details['target_team']
+                            details['target_team'],
+                            market_id=market_id,
+                            credits=credits
                         )
                     
                     elif market_type == 'crypto':
                         # 1. Early Win Check (Checking if target hit ANYTIME)
                         # We use live data to see if it hit the target right now
-                        c_data = self.get_crypto_price(details['symbol'])
+                        c_data = self.get_crypto_price(details['symbol'], credits)
                         if c_data and c_data['current_price'] >= details['target_price']:
-                            print(f"\n🎯 Market #{market_id} (Crypto) - EARLY WIN!")
+                            print(f"\n🎯 Market #{market_id} (Crypto) [priority {score:.1f}] - EARLY WIN!")
                             print(f"   🚀 Price ${c_data['current_price']:.2f} hit target ${details['target_price']:.2f}")
                             result = True
                         
                         # 2. Historical Check (Only if expired and haven't found a win yet)
                         # NEW: User requested only CMC price at end of duration
                         elif is_expired:
-                            print(f"\n🎯 Market #{market_id} (Crypto) - Expired")
+                            print(f"\n🎯 Market #{market_id} (Crypto) [priority {score:.1f}] - Expired")
                             result = self.resolve_crypto_target(
                                 details['symbol'],
-                                details['target_price']
+                                details['target_price'],
+                                data=c_data,
+                                credits=credits
                             )
                     
-                    elif market_type == 'stock' and is_expired:
-                        print(f"\n🎯 Market #{market_id} (Stock)")
-                        # Stocks not implemented yet
-                        print(f"   ⚠️ Stock resolution not yet implemented")
-                        continue
-                    
                     # Submit resolution if we have a result
                     if result is not None:
-                        success = self.submit_resolution(market_id, result, description)
+                        if not budget.spend('rpc', RPC_PER_TX):
+                            print(f"   ⏭️  RPC budget reached, market #{market_id} deferred")
+                            deferred += 1
+                            continue
+                        budget.spend_held('tx')
+                        tx_held = False
+                        success = self.submit_resolution(market_id, result, item['description'])
                         if success:
                             resolved_count += 1
-                            time.sleep(3)  # Prevent RPC overload
+                            self.sleep(3)  # Prevent RPC overload
                     elif is_expired:
                         print(f"   ⏳ Market expired but no result available yet")
                     
                 except Exception as e:
                     print(f"   ❌ Error on market #{market_id}: {e}")
                     continue
+                finally:
+                    credits.close()
+                    if tx_held:
+                        budget.release('tx')
             
+            deferred += len(queue)
+            if deferred:
+                print(f"\n⏭️  Deferred {deferred} markets to next cycle (budget {budget.summary()})")
             print(f"\n✅ Resolved {resolved_count} markets this cycle\n", flush=True)
             
         except Exception as e:
@@ -537,7 +804,7 @@ class RealOracleAgent:
                 'chainId': self.w3.eth.chain_id
             })
             
-            signed = self.w3.eth.account.sign_transaction(tx, PRIVATE_KEY)
+            signed = self.w3.eth.account.sign_transaction(tx, self.account.key)
             raw = getattr(signed, 'raw_transaction', getattr(signed, 'rawTransaction', None))
             tx_hash = self.w3.eth.send_raw_transaction(raw)
             
@@ -562,11 +829,16 @@ class RealOracleAgent:
         
         while True:
             try:
+                if self.cassette and not self.cassette.start_cycle():
+                    print(f"\n📼 Cassette replay finished: {self.cassette.report()}")
+                    break
                 cycle += 1
                 print(f"\n{'='*60}")
-                print(f"🔄 Cycle #{cycle} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                print(f"🔄 Cycle #{cycle} - {datetime.fromtimestamp(self.now()).strftime('%Y-%m-%d %H:%M:%S')}")
                 print(f"{'='*60}")
                 
+                self.refresh_team_index()
+                
                 # 1. Resolve expired markets FIRST (Priority)
                 print("\n⚖️  RESOLVING MARKETS...")
                 self.resolve_expired_markets()
@@ -578,11 +850,14 @@ class RealOracleAgent:
                 
                 total_created = football_created + crypto_created
                 print(f"\n📊 Summary: Created {total_created} new markets")
+                self.team_index.save()
+                if self.cassette:
+                    self.cassette.end_cycle()
                 
                 # 3. Wait before next cycle
                 wait_minutes = 30 # Run every 30 minutes for faster resolution
                 print(f"\n💤 Next cycle in {wait_minutes} minutes...", flush=True)
-                time.sleep(wait_minutes * 60)
+                self.sleep(wait_minutes * 60, idle=True)
                 
             except KeyboardInterrupt:
                 print("\n\n👋 Agent stopped by user")
@@ -590,7 +865,455 @@ class RealOracleAgent:
             except Exception as e:
                 print(f"\n❌ Cycle error: {e}")
                 print("Retrying in 5 minutes...")
-                time.sleep(300)
+                self.sleep(300, idle=True)
+        
+        if self.cassette:
+            self.cassette.close()
+
+
+class AsyncOracleAgent(RealOracleAgent):
+    """
+    Async Oracle Agent - cùng logic với RealOracleAgent nhưng chạy song song
+    - AsyncWeb3 + aiohttp, mỗi loại I/O được giới hạn bằng semaphore riêng
+    - Resolve và create markets chạy chồng lên nhau trong cùng một cycle
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.aw3 = AsyncWeb3(
+            self.cassette.async_web3_provider(RPC_URL) if self.cassette else AsyncWeb3.AsyncHTTPProvider(RPC_URL)
+        )
+        self.acontract = self.aw3.eth.contract(
+            address=self.aw3.to_checksum_address(self.contract_address),
+            abi=ABI
+        )
+        # Created inside the event loop (see run_async)
+        self.http = None
+        self._price_tasks = {}
+        self._nonce = None
+        
+        print(f"⚡ Async mode: rpc={RPC_CONCURRENCY} http={HTTP_CONCURRENCY} tx={TX_CONCURRENCY}")
+    
+    # ==================== ASYNC I/O ====================
+    
+    async def _get_json(self, url, **kwargs):
+        """GET under the HTTP semaphore. Returns (status, json or None)"""
+        async with self.http_sem:
+            if self.cassette:
+                key = self.cassette.http_key('GET', url, kwargs.get('params'))
+                status, text = await self.cassette.acall('http', key, lambda: self._get_text(url, **kwargs))
+            else:
+                status, text = await self._get_text(url, **kwargs)
+        if status != 200:
+            return status, None
+        return status, json.loads(text) if text.strip() else None
+    
+    async def _get_text(self, url, **kwargs):
+        async with self.http.get(url, timeout=aiohttp.ClientTimeout(total=10), **kwargs) as r:
+            return [r.status, await r.text()]
+    
+    async def async_sleep(self, seconds, idle=False):
+        if self.cassette:
+            await self.cassette.async_sleep(seconds, idle)
+        else:
+            await asyncio.sleep(seconds)
+    
+    async def _call(self, fn):
+        async with self.rpc_sem:
+            return await fn.call()
+    
+    async def _read_markets(self, market_ids, refresh=True):
+        """Read markets concurrently (as v1-shaped rows), logging and dropping failed reads"""
+        market_ids = list(market_ids)
+        # Layout detection + MarketCreated indexing use the sync provider
+        if refresh:
+            await asyncio.to_thread(self.markets.refresh)
+        rows = await asyncio.gather(
+            *(self._call(self.markets.market_fn(self.acontract, i)) for i in market_ids),
+            return_exceptions=True
+        )
+        markets = []
+        for i, m in zip(market_ids, rows):
+            if isinstance(m, Exception):
+                print(f"   ❌ Error on market #{i}: {m}")
+            else:
+                markets.append((i, self.markets.to_row(i, m)))
+        return markets
+    
+    async def _send_tx(self, fn, gas):
+        """Build, sign and send a tx with a locally allocated nonce"""
+        async with self.tx_sem:
+            async with self.nonce_lock:
+                if self._nonce is None:
+                    self._nonce = await self.aw3.eth.get_transaction_count(self.account.address, 'pending')
+                nonce = self._nonce
+                self._nonce += 1
+            try:
+                tx = await fn.build_transaction({
+                    'from': self.account.address,
+                    'nonce': nonce,
+                    'gas': gas,
+                    'gasPrice': self._gas_price,
+                    'chainId': self._chain_id
+                })
+                signed = self.aw3.eth.account.sign_transaction(tx, self.account.key)
+                raw = getattr(signed, 'raw_transaction', getattr(signed, 'rawTransaction', None))
+                return await self.aw3.eth.send_raw_transaction(raw)
+            except Exception:
+                # A skipped nonce would stall every later tx: resync from the node
+                async with self.nonce_lock:
+                    self._nonce = None
+                raise
+    
+    # ==================== ASYNC ORACLES ====================
+    
+    async def fetch_live_football_fixtures_async(self, max_fixtures=None):
+        """All leagues are fetched concurrently, then merged in FOOTBALL_LEAGUES order"""
+        print("📡 Fetching football fixtures from TheSportsDB...")
+        
+        async def fetch(league_name, league_id):
+            try:
+                url = f"https://www.thesportsdb.com/api/v1/json/{FOOTBALL_API_KEY}/eventsnextleague.php?id={league_id}"
+                status, data = await self._get_json(url)
+                if status != 200:
+                    print(f"   ⚠️ TheSportsDB Blocked {league_name} (Status {status})")
+                return data
+            except Exception as e:
+                print(f"   ❌ Error fetching {league_name}: {e}")
+                return None
+        
+        payloads = await asyncio.gather(*(fetch(n, i) for n, i in FOOTBALL_LEAGUES.items()))
+        
+        fixtures = []
+        seen_event_ids = set()
+        for league_name, data in zip(FOOTBALL_LEAGUES, payloads):
+            self.collect_fixtures(data, league_name, fixtures, seen_event_ids, max_fixtures)
+            if max_fixtures and len(fixtures) >= max_fixtures:
+                break
+        return fixtures
+    
+    async def resolve_football_match_async(self, home_team, away_team, target_team, event_id=None, market_id=None, credits=None):
+        max_retries = FOOTBALL_RESOLVE_ATTEMPTS - 1
+        for attempt in range(max_retries + 1):
+            try:
+                print(f"   🔍 Checking match: {home_team} vs {away_team} (Target: {target_team})")
+                
+                # Method 1: Use Event ID
+                if event_id:
+                    url = f"https://www.thesportsdb.com/api/v1/json/{FOOTBALL_API_KEY}/lookupevent.php?id={event_id}"
+                    if credits:
+                        credits.charge()
+                    _, data = await self._get_json(url)
+                    if data and data.get('events'):
+                        result = self.football_result(data['events'][:1], home_team, away_team, target_team)
+                        if result is not None and result is not UNMATCHED:
+                            return self.settle_football_result(market_id, result, home_team, away_team)
+                
+                # Method 2: Search by Names
+                if credits:
+                    credits.charge()
+                _, data = await self._get_json(self.search_events_url(home_team, away_team))
+                events = (data.get('event') or []) if data else []
+                
+                result = self.football_result(events, home_team, away_team, target_team)
+                return self.settle_football_result(market_id, result, home_team, away_team)
+            except Exception as e:
+                if attempt < max_retries:
+                    print(f"   ⚠️ Football Resolution Attempt {attempt+1} failed ({e}). Retrying...")
+                    await self.async_sleep(2)
+                else:
+                    print(f"   ❌ Football Resolution Error: {e}")
+                    return None
+    
+    async def get_crypto_price_async(self, symbol, credits=None):
+        """CMC price, shared by every market of the same symbol within one cycle (the first caller pays)"""
+        if symbol not in self._price_tasks:
+            if credits and CMC_API_KEY:
+                credits.charge()
+            self._price_tasks[symbol] = asyncio.ensure_future(self._fetch_crypto_price(symbol))
+        return await self._price_tasks[symbol]
+    
+    async def _fetch_crypto_price(self, symbol):
+        if not CMC_API_KEY:
+            print("   ❌ CMC_API_KEY is missing!")
+            return None
+        try:
+            params = {'symbol': symbol, 'convert': 'USD'}
+            status, data = await self._get_json(CMC_QUOTES_URL, params=params, headers=CMC_HEADERS)
+            if data:
+                price = data['data'][symbol]['quote']['USD']['price']
+                return {'symbol': symbol, 'current_price': float(price), 'source': 'CoinMarketCap'}
+            print(f"   ⚠️ CoinMarketCap API Error (Status {status})")
+        except Exception as e:
+            print(f"   ⚠️ CoinMarketCap Exception: {e}")
+        return None
+    
+    async def resolve_crypto_target_async(self, symbol, target_price):
+        try:
+            print(f"   🔍 Resolving {symbol} via CMC (Current Price Check)...")
+            data = await self.get_crypto_price_async(symbol)
+            if data:
+                current_price = data['current_price']
+                result = current_price >= target_price
+                print(f"   📊 {symbol} Target: ${target_price:.2f} | Current Price: ${current_price:.2f} | Result: {result}")
+                return result
+            return None
+        except Exception as e:
+            print(f"   ❌ Crypto Resolution Error (CMC): {e}")
+            return None
+    
+    # ==================== ASYNC MARKETS ====================
+    
+    async def get_active_markets_async(self):
+        try:
+            count = await self._call(self.acontract.functions.marketCount())
+            rows = await self._read_markets(range(max(1, count - 99), count + 1))
+            return [
+                {'id': i, 'description': m[0], 'category': m[1], 'deadline': m[6]}
+                for i, m in rows if not m[4]
+            ]
+        except Exception as e:
+            print(f"Error fetching active markets: {e}")
+            return []
+    
+    async def deploy_market_async(self, description, category, duration):
+        """Returns the tx hash, or None on failure"""
+        try:
+            tx_hash = await self._send_tx(self.acontract.functions.createMarket(description, category, duration), 1000000)
+            print(f"   ✅ TX: {tx_hash.hex()}")
+            return tx_hash.hex()
+        except Exception as e:
+            print(f"   ❌ Deploy error: {e}")
+            return None
+    
+    async def create_football_markets_async(self, active):
+        await asyncio.to_thread(self.settle_fixture_markets)
+        fixtures = await self.fetch_live_football_fixtures_async()
+        if not self.fixture_index.seeded:
+            self.seed_fixture_index(fixtures, await active)
+        
+        async def create(fixture, desc, duration):
+            tx_hash = await self.deploy_market_async(desc, "Football", duration)
+            if tx_hash:
+                self.fixture_index.record(fixture, tx_hash, now=self.now())
+                print(f"⚽ Created: {fixture['home']} vs {fixture['away']}")
+                return True
+            return False
+        
+        created = await asyncio.gather(*(create(*job) for job in self.select_new_fixtures(fixtures)))
+        self.fixture_index.save(self.now())
+        return sum(created)
+    
+    async def create_crypto_markets_async(self, active, resolving):
+        # Markets resolved this cycle no longer block a new market for their symbol (as in sync mode)
+        resolved = await resolving
+        active_crypto = [m for m in await active if m['category'] == 'Crypto' and m['id'] not in resolved]
+        
+        async def create(symbol, name, volatility):
+            try:
+                if any(f"({symbol})" in m['description'] for m in active_crypto):
+                    print(f"⏭️  Skipping {symbol}: Active market exists")
+                    return False
+                
+                data = await self.get_crypto_price_async(symbol)
+                if not data:
+                    print(f"⚠️  Could not fetch price for {symbol}")
+                    return False
+                
+                current_price = data['current_price']
+                target, desc = self.crypto_market_description(symbol, name, volatility, current_price)
+                
+                if await self.deploy_market_async(desc, "Crypto", 21600):  # 6 hours
+                    print(f"₿ Created {symbol} market: ${current_price:.2f} → ${target:.2f}")
+                    return True
+            except Exception as e:
+                print(f"❌ Error creating {symbol} market: {e}")
+            return False
+        
+        return sum(await asyncio.gather(*(create(*asset) for asset in CRYPTO_ASSETS)))
+    
+    # ==================== ASYNC RESOLUTION ====================
+    
+    async def resolve_expired_markets_async(self):
+        """
+        Same queue and budget as resolve_expired_markets, with the drained markets resolved concurrently
+        Returns: ids of the markets a resolveMarket tx was sent for
+        """
+        resolved = set()
+        try:
+            budget = WorkBudget()
+            count = await self._call(self.acontract.functions.marketCount())
+            budget.spend('rpc')
+            now = int(self.now())
+            
+            print(f"\n🔍 Scanning {count} markets for resolution...", flush=True)
+            
+            rpc_reserve = budget.rpc_reserve(RPC_PER_TX)
+            await asyncio.to_thread(self.refresh_markets, budget, rpc_reserve)
+            market_ids = []
+            for market_id in self.scan_market_ids(count):
+                if not budget.spend('rpc', reserve=rpc_reserve):
+                    self.stop_scan(market_id)
+                    break
+                market_ids.append(market_id)
+            
+            queue = ResolutionQueue()
+            for market_id, m in await self._read_markets(market_ids, refresh=False):
+                self.enqueue_market(queue, market_id, m, now)
+            
+            print(f"   📋 Queue: {len(queue)} resolvable, {queue.not_ready} waiting for oracle data")
+            
+            # drain() stops once every remaining tx is held, so markets are released in
+            # batches of the tx budget; txs released by markets without a result
+            # let the next batch through
+            outcomes = []
+            while queue:
+                batch = list(queue.drain(budget))
+                if not batch:
+                    break
+                batch_outcomes = await asyncio.gather(*(
+                    self._resolve_market_async(market_id, score, credits, item, budget)
+                    for market_id, score, credits, item in batch
+                ))
+                resolved.update(market_id for (market_id, _, _, _), outcome in zip(batch, batch_outcomes) if outcome == 'sent')
+                outcomes += batch_outcomes
+            
+            deferred = outcomes.count('deferred') + len(queue)
+            if deferred:
+                print(f"\n⏭️  Deferred {deferred} markets to next cycle (budget {budget.summary()})")
+            print(f"\n✅ Resolved {outcomes.count('sent')} markets this cycle\n", flush=True)
+        except Exception as e:
+            print(f"❌ Resolution scan error: {e}")
+        return resolved
+    
+    async def _resolve_market_async(self, market_id, score, credits, item, budget):
+        """Returns 'sent', 'deferred' (out of RPC budget) or None. Settles the credits and tx held by drain()"""
+        tx_held = True
+        try:
+            details = item['details']
+            is_expired = item['is_expired']
+            result = None
+            market_type = details['type']
+            
+            if market_type == 'football':
+                print(f"\n🎯 Market #{market_id} (Football) [priority {score:.1f}]")
+                result = await self.resolve_football_match_async(
+                    details['home'],
+                    details['away'],
+                    details['target_team'],
+                    market_id=market_id,
+                    credits=credits
+                )
+            
+            elif market_type == 'crypto':
+                c_data = await self.get_crypto_price_async(details['symbol'], credits)
+                if c_data and c_data['current_price'] >= details['target_price']:
+                    print(f"\n🎯 Market #{market_id} (Crypto) [priority {score:.1f}] - EARLY WIN!")
+                    print(f"   🚀 Price ${c_data['current_price']:.2f} hit target ${details['target_price']:.2f}")
+                    result = True
+                elif is_expired:
+                    print(f"\n🎯 Market #{market_id} (Crypto) [priority {score:.1f}] - Expired")
+                    result = await self.resolve_crypto_target_async(details['symbol'], details['target_price'])
+            
+            if result is not None:
+                if not budget.spend('rpc', RPC_PER_TX):
+                    print(f"   ⏭️  RPC budget reached, market #{market_id} deferred")
+                    return 'deferred'
+                budget.spend_held('tx')
+                tx_held = False
+                if await self.submit_resolution_async(market_id, result):
+                    return 'sent'
+            elif is_expired:
+                print(f"   ⏳ Market #{market_id} expired but no result available yet")
+        except Exception as e:
+            print(f"   ❌ Error on market #{market_id}: {e}")
+        finally:
+            credits.close()
+            if tx_held:
+                budget.release('tx')
+        return None
+    
+    async def submit_resolution_async(self, market_id, result):
+        try:
+            tx_hash = await self._send_tx(self.acontract.functions.resolveMarket(market_id, result), 800000)
+            result_text = "✅ YES" if result else "❌ NO"
+            print(f"   📝 Market #{market_id} Resolution: {result_text}")
+            print(f"   🔗 TX: {tx_hash.hex()}")
+            return True
+        except Exception as e:
+            print(f"   ❌ TX Error (#{market_id}): {e}")
+            return False
+    
+    # ==================== ASYNC MAIN LOOP ====================
+    
+    async def run_cycle_async(self):
+        """One cycle: resolve and create phases overlap. Returns number of markets created"""
+        self._price_tasks = {}
+        self._nonce = None
+        self._chain_id = await self.aw3.eth.chain_id
+        self._gas_price = int(await self.aw3.eth.gas_price * 1.2)
+        await asyncio.to_thread(self.refresh_team_index)
+        
+        print("\n⚖️  RESOLVING + 📝 CREATING MARKETS (concurrent)...")
+        # Shared by both create phases (was fetched twice in sync mode)
+        active = asyncio.ensure_future(self.get_active_markets_async())
+        resolving = asyncio.ensure_future(self.resolve_expired_markets_async())
+        _, football_created, crypto_created = await asyncio.gather(
+            resolving,
+            self.create_football_markets_async(active),
+            self.create_crypto_markets_async(active, resolving)
+        )
+        self.team_index.save()
+        return football_created + crypto_created
+    
+    async def run_async(self):
+        self.rpc_sem = asyncio.Semaphore(RPC_CONCURRENCY)
+        self.http_sem = asyncio.Semaphore(HTTP_CONCURRENCY)
+        self.tx_sem = asyncio.Semaphore(TX_CONCURRENCY)
+        self.nonce_lock = asyncio.Lock()
+        
+        print("\n" + "="*60)
+        print("🔮 REAL ORACLE AGENT - FULLY AUTOMATED (ASYNC)")
+        print("="*60)
+        
+        async with aiohttp.ClientSession(headers=HEADERS) as http:
+            self.http = http
+            cycle = 0
+            
+            while True:
+                try:
+                    if self.cassette and not self.cassette.start_cycle():
+                        print(f"\n📼 Cassette replay finished: {self.cassette.report()}")
+                        break
+                    cycle += 1
+                    print(f"\n{'='*60}")
+                    print(f"🔄 Cycle #{cycle} - {datetime.fromtimestamp(self.now()).strftime('%Y-%m-%d %H:%M:%S')}")
+                    print(f"{'='*60}")
+                    
+                    started = time.perf_counter()
+                    total_created = await self.run_cycle_async()
+                    print(f"\n📊 Summary: Created {total_created} new markets ({time.perf_counter() - started:.1f}s)")
+                    if self.cassette:
+                        self.cassette.end_cycle()
+                    
+                    wait_minutes = 30
+                    print(f"\n💤 Next cycle in {wait_minutes} minutes...", flush=True)
+                    await self.async_sleep(wait_minutes * 60, idle=True)
+                    
+                except Exception as e:
+                    print(f"\n❌ Cycle error: {e}")
+                    print("Retrying in 5 minutes...")
+                    await self.async_sleep(300, idle=True)
+    
+    def run(self):
+        """Main agent loop (async)"""
+        try:
+            asyncio.run(self.run_async())
+        except KeyboardInterrupt:
+            print("\n\n👋 Agent stopped by user")
+        finally:
+            if self.cassette:
+                self.cassette.close()
 
 
 # ==================== WEB SERVER ====================
@@ -598,38 +1321,98 @@ class RealOracleAgent:
 import threading
 from flask import Flask, jsonify
 
+from bet_aggregator import BetAggregator
+
 app = Flask(__name__)
 agent_instance = None
+aggregator_instance = None
+status_reader = None
 
 @app.route('/')
 def health_check():
     return jsonify({
         'status': 'running',
-        'agent': 'RealOracleAgent',
+        'agent': type(agent_instance).__name__ if agent_instance else 'RealOracleAgent',
+        'mode': AGENT_MODE,
         'timestamp': datetime.now().isoformat()
     }), 200
 
+def get_status_reader():
+    """Reader on its own provider, so health probes stay out of the agent's cassette and caches"""
+    global status_reader
+    if status_reader is None:
+        status_reader = MarketReader(Web3(Web3.HTTPProvider(RPC_URL)), agent_instance.contract_address)
+    return status_reader
+
 @app.route('/status')
 def status():
     try:
         if agent_instance:
-            count = agent_instance.contract.functions.marketCount().call()
-            active = agent_instance.get_active_markets()
+            reader = get_status_reader()
+            count = reader.contract.functions.marketCount().call()
+            active = 0
+            for i in range(max(1, count - 99), count + 1):
+                try:
+                    active += not reader.read(i)[4]
+                except:
+                    continue
             return jsonify({
                 'status': 'active',
                 'total_markets': count,
-                'active_markets': len(active),
+                'active_markets': active,
                 'agent_address': agent_instance.account.address
             })
     except:
         pass
     return jsonify({'status': 'initializing'}), 200
 
+@app.route('/aggregator')
+def aggregator_status():
+    if not aggregator_instance:
+        return jsonify({'status': 'initializing'}), 503
+    return jsonify(aggregator_instance.status())
+
+@app.route('/markets/<int:market_id>/odds')
+def market_odds(market_id):
+    if not aggregator_instance:
+        return jsonify({'status': 'initializing'}), 503
+    odds = aggregator_instance.market_odds(market_id)
+    if odds is None:
+        return jsonify({'error': 'no bets seen for this market'}), 404
+    return jsonify(odds)
+
+@app.route('/markets/<int:market_id>/volume')
+def market_volume(market_id):
+    if not aggregator_instance:
+        return jsonify({'status': 'initializing'}), 503
+    return jsonify(aggregator_instance.market_volume(market_id))
+
+@app.route('/exposure/<address>')
+def exposure(address):
+    if not aggregator_instance:
+        return jsonify({'status': 'initializing'}), 503
+    try:
+        data = aggregator_instance.exposure(address)
+    except ValueError:
+        return jsonify({'error': 'invalid address'}), 400
+    if data is None:
+        return jsonify({'error': 'no activity for this address'}), 404
+    return jsonify(data)
+
+def run_aggregator():
+    global aggregator_instance
+    try:
+        aggregator_instance = BetAggregator(Web3(Web3.HTTPProvider(RPC_URL)), CONTRACT_ADDRESS)
+        aggregator_instance.run()
+    except Exception as e:
+        print(f"❌ CRITICAL ERROR IN AGGREGATOR THREAD: {e}", flush=True)
+
 def run_agent():
     global agent_instance
     try:
         print("🚀 Background Agent Thread STARTING...", flush=True)
-        agent_instance = RealOracleAgent()
+        agent_class = AsyncOracleAgent if AGENT_MODE == 'async' else RealOracleAgent
+        agent_instance = agent_class()
         agent_instance.run()
     except Exception as e:
         print(f"❌ CRITICAL ERROR IN AGENT THREAD: {e}", flush=True)
@@ -645,6 +1428,10 @@ if __name__ == "__main__":
     agent_thread = threading.Thread(target=run_agent, daemon=True)
     agent_thread.start()
     
+    # Start bet/odds aggregator in its own thread (independent of agent cycles)
+    aggregator_thread = threading.Thread(target=run_aggregator, daemon=True)
+    aggregator_thread.start()
+    
     # Start Flask server
     port = int(os.environ.get("PORT", 8080))
     print(f"\n🌐 Health check server on port {port}", flush=True)
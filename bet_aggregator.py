@@ -0,0 +1,250 @@
+"""
+Bet Aggregator
+- Đọc log BetPlaced / MarketResolved / RewardClaimed theo từng block range (incremental)
+- Giữ odds, volume theo time bucket và exposure theo address trong memory
+- Định kỳ lưu ra JSON để restart không phải quét lại từ đầu
+"""
+import os
+import json
+import time
+import threading
+
+from web3 import Web3
+
+AGGREGATOR_FILE = os.getenv('BET_AGGREGATOR_FILE', './cache/bet_aggregator.json')
+# Block of the NeonSlashVault deployment (contracts/broadcast/DeployFull.s.sol)
+VAULT_DEPLOY_BLOCK = int(os.getenv('VAULT_DEPLOY_BLOCK', '25984343'))
+LOG_CHUNK_BLOCKS = int(os.getenv('LOG_CHUNK_BLOCKS', '5000'))
+VOLUME_BUCKET_SECONDS = int(os.getenv('VOLUME_BUCKET_SECONDS', '3600'))
+POLL_SECONDS = int(os.getenv('BET_AGGREGATOR_POLL_SECONDS', '30'))
+PERSIST_SECONDS = int(os.getenv('BET_AGGREGATOR_PERSIST_SECONDS', '300'))
+
+EVENTS_ABI = [
+    {"anonymous":False,"inputs":[{"indexed":True,"internalType":"uint256","name":"marketId","type":"uint256"},{"indexed":True,"internalType":"address","name":"user","type":"address"},{"indexed":False,"internalType":"bool","name":"prediction","type":"bool"},{"indexed":False,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"BetPlaced","type":"event"},
+    {"anonymous":False,"inputs":[{"indexed":True,"internalType":"uint256","name":"marketId","type":"uint256"},{"indexed":False,"internalType":"bool","name":"result","type":"bool"}],"name":"MarketResolved","type":"event"},
+    {"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"user","type":"address"},{"indexed":False,"internalType":"uint256","name":"pointsRedeemed","type":"uint256"},{"indexed":False,"internalType":"uint256","name":"usdcReward","type":"uint256"}],"name":"RewardClaimed","type":"event"}
+]
+EVENT_SIGNATURES = {
+    'BetPlaced': 'BetPlaced(uint256,address,bool,uint256)',
+    'MarketResolved': 'MarketResolved(uint256,bool)',
+    'RewardClaimed': 'RewardClaimed(address,uint256,uint256)',
+}
+
+# Compact row layouts (lists keep the JSON and the in-memory footprint small)
+# market: [totalYes, totalNo, bets, result]  result = None (open) / True / False
+M_YES, M_NO, M_BETS, M_RESULT = range(4)
+# account: [open stake, total staked, stake won, stake lost, bets, points redeemed, usdc rewarded]
+A_OPEN, A_STAKED, A_WON, A_LOST, A_BETS, A_REDEEMED, A_USDC = range(7)
+
+
+class BetAggregator:
+    """
+    Running per-market odds/volume and per-address exposure built from contract logs.
+    Every query is a dict lookup; log processing is O(new logs) per poll.
+    """
+
+    def __init__(self, w3, contract_address, path=AGGREGATOR_FILE):
+        self.w3 = w3
+        self.path = path
+        self.address = w3.to_checksum_address(contract_address)
+        self.contract = w3.eth.contract(address=self.address, abi=EVENTS_ABI)
+        self.topics = {Web3.keccak(text=sig).hex(): name for name, sig in EVENT_SIGNATURES.items()}
+        self.lock = threading.Lock()
+
+        self.last_block = VAULT_DEPLOY_BLOCK - 1
+        self.markets = {}    # market_id -> market row
+        self.volume = {}     # market_id -> {bucket_start: amount}
+        self.positions = {}  # market_id -> {address: [prediction, amount]} (open markets only)
+        self.accounts = {}   # address -> account row
+        self._block_times = {}
+        self._last_persist = time.time()
+        self.load()
+
+    # ==================== PERSISTENCE ====================
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get('contract', '').lower() != self.address.lower():
+                print("   ⚠️ Aggregator cache belongs to another contract, rebuilding")
+                return
+            self.last_block = data['last_block']
+            # JSON object keys are strings: restore int ids/buckets
+            self.markets = {int(k): v for k, v in data['markets'].items()}
+            self.volume = {int(k): {int(b): a for b, a in v.items()} for k, v in data['volume'].items()}
+            self.positions = {int(k): v for k, v in data['positions'].items()}
+            self.accounts = data['accounts']
+        except Exception as e:
+            print(f"   ⚠️ Could not load aggregator cache ({e}), rebuilding")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self.lock:
+            data = json.dumps({
+                'contract': self.address,
+                'last_block': self.last_block,
+                'markets': self.markets,
+                'volume': self.volume,
+                'positions': self.positions,
+                'accounts': self.accounts,
+            })
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+        self._last_persist = time.time()
+
+    # ==================== INGEST ====================
+
+    def _block_time(self, block_number):
+        ts = self._block_times.get(block_number)
+        if ts is None:
+            ts = self.w3.eth.get_block(block_number)['timestamp']
+            if len(self._block_times) > 10000:
+                self._block_times.clear()
+            self._block_times[block_number] = ts
+        return ts
+
+    def _account(self, address):
+        row = self.accounts.get(address)
+        if row is None:
+            row = self.accounts[address] = [0, 0, 0, 0, 0, 0, 0]
+        return row
+
+    def _apply(self, name, args, block_number):
+        if name == 'BetPlaced':
+            market_id, user, amount = args['marketId'], args['user'], args['amount']
+            market = self.markets.setdefault(market_id, [0, 0, 0, None])
+            market[M_YES if args['prediction'] else M_NO] += amount
+            market[M_BETS] += 1
+
+            bucket = self._block_time(block_number) // VOLUME_BUCKET_SECONDS * VOLUME_BUCKET_SECONDS
+            buckets = self.volume.setdefault(market_id, {})
+            buckets[bucket] = buckets.get(bucket, 0) + amount
+
+            account = self._account(user)
+            account[A_STAKED] += amount
+            account[A_BETS] += 1
+            if market[M_RESULT] is None:
+                account[A_OPEN] += amount
+                self.positions.setdefault(market_id, {})[user] = [args['prediction'], amount]
+
+        elif name == 'MarketResolved':
+            market_id, result = args['marketId'], args['result']
+            self.markets.setdefault(market_id, [0, 0, 0, None])[M_RESULT] = result
+            # Settle exposure once; resolved markets keep no per-user rows
+            for user, (prediction, amount) in self.positions.pop(market_id, {}).items():
+                account = self._account(user)
+                account[A_OPEN] -= amount
+                account[A_WON if prediction == result else A_LOST] += amount
+
+        elif name == 'RewardClaimed':
+            account = self._account(args['user'])
+            account[A_REDEEMED] += args['pointsRedeemed']
+            account[A_USDC] += args['usdcReward']
+
+    def sync(self, max_chunks=20):
+        """Consume logs up to the chain head (at most max_chunks ranges per call). Returns logs applied"""
+        head = self.w3.eth.block_number
+        applied = 0
+        for _ in range(max_chunks):
+            if self.last_block >= head:
+                break
+            from_block = self.last_block + 1
+            to_block = min(from_block + LOG_CHUNK_BLOCKS - 1, head)
+            # One get_logs for all three events instead of one filter per event
+            logs = self.w3.eth.get_logs({
+                'address': self.address,
+                'fromBlock': from_block,
+                'toBlock': to_block,
+                'topics': [list(self.topics)],
+            })
+            decoded = []
+            for log in logs:
+                name = self.topics.get(log['topics'][0].hex())
+                event = getattr(self.contract.events, name)().process_log(log)
+                decoded.append((log['blockNumber'], log['logIndex'], name, event['args']))
+            decoded.sort(key=lambda d: (d[0], d[1]))
+
+            with self.lock:
+                for block_number, _, name, args in decoded:
+                    self._apply(name, args, block_number)
+                self.last_block = to_block
+            applied += len(decoded)
+
+        if time.time() - self._last_persist >= PERSIST_SECONDS:
+            self.save()
+        return applied
+
+    def run(self):
+        """Background polling loop"""
+        print(f"📈 Bet aggregator ACTIVE from block {self.last_block + 1}", flush=True)
+        while True:
+            try:
+                applied = self.sync()
+                if applied:
+                    print(f"📈 Aggregated {applied} events (block {self.last_block})", flush=True)
+            except Exception as e:
+                print(f"   ⚠️ Bet aggregator error: {e}")
+            time.sleep(POLL_SECONDS)
+
+    # ==================== QUERIES ====================
+
+    def market_odds(self, market_id):
+        with self.lock:
+            market = self.markets.get(market_id)
+            if market is None:
+                return None
+            yes, no, bets, result = market
+        total = yes + no
+        return {
+            'market_id': market_id,
+            'total_yes': yes,
+            'total_no': no,
+            'volume': total,
+            'bets': bets,
+            'resolved': result is not None,
+            'result': result,
+            # Pari-mutuel: implied probability = side share, payout = pool / side
+            'implied_yes': yes / total if total else 0.5,
+            'implied_no': no / total if total else 0.5,
+            'payout_yes': total / yes if yes else None,
+            'payout_no': total / no if no else None,
+        }
+
+    def market_volume(self, market_id):
+        with self.lock:
+            buckets = dict(self.volume.get(market_id, {}))
+        return {
+            'market_id': market_id,
+            'bucket_seconds': VOLUME_BUCKET_SECONDS,
+            'buckets': [{'start': start, 'amount': amount} for start, amount in sorted(buckets.items())],
+        }
+
+    def exposure(self, address):
+        with self.lock:
+            row = self.accounts.get(Web3.to_checksum_address(address))
+            row = list(row) if row else None
+        if row is None:
+            return None
+        return {
+            'address': Web3.to_checksum_address(address),
+            'open_stake': row[A_OPEN],
+            'total_staked': row[A_STAKED],
+            'stake_won': row[A_WON],
+            'stake_lost': row[A_LOST],
+            'bets': row[A_BETS],
+            'points_redeemed': row[A_REDEEMED],
+            'usdc_rewarded': row[A_USDC],
+        }
+
+    def status(self):
+        return {
+            'last_block': self.last_block,
+            'markets': len(self.markets),
+            'open_markets': len(self.positions),
+            'accounts': len(self.accounts),
+        }
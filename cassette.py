@@ -0,0 +1,399 @@
+"""
+Agent Cassette
+- Record: ghi mọi request/response (HTTP session, CMC, Web3 provider) kèm thời gian vào file .jsonl.gz
+- Replay: chạy lại agent offline từ cassette, full speed hoặc đúng timing đã ghi
+- Clock của agent được replay theo thời điểm đã ghi nên deadline/duration tính giống hệt lúc record
+
+Usage:
+    AGENT_CASSETTE=cassettes/run.jsonl.gz AGENT_CASSETTE_MODE=record python ProphetAgent.py
+    python cassette.py replay cassettes/run.jsonl.gz [--recorded] [--async]
+    python cassette.py info cassettes/run.jsonl.gz
+"""
+import os
+import sys
+import json
+import gzip
+import time
+import asyncio
+import tempfile
+import threading
+from collections import deque
+from urllib.parse import urlencode
+
+import requests
+from web3 import Web3, AsyncWeb3
+
+AGENT_CASSETTE = os.getenv('AGENT_CASSETTE', '')
+AGENT_CASSETTE_MODE = os.getenv('AGENT_CASSETTE_MODE', '').strip().lower()  # record | replay
+# fast: responses return immediately, agent sleeps are skipped
+# recorded: each response is released at its recorded offset within the cycle
+CASSETTE_TIMING = os.getenv('CASSETTE_TIMING', 'fast').strip().lower()
+CASSETTE_VERSION = 1
+
+# Matched by method only: their params (nonce owner, signed payload) differ between runs
+VOLATILE_RPC_METHODS = {'eth_sendRawTransaction', 'eth_getTransactionCount'}
+
+
+class CassetteMiss(Exception):
+    """Replay reached a request that was not recorded (the run diverged from the cassette)"""
+
+
+class RecordedError(Exception):
+    """An exception raised by the live service during recording, replayed as-is"""
+
+
+def _json_default(value):
+    return value.hex() if hasattr(value, 'hex') else str(value)
+
+
+class Cassette:
+    """
+    File layout (gzip, one JSON object per line):
+      header: {'cassette': version, 'started': unix, 'meta': {...}, 'state': {name: file content}}
+      cycle:  {'c': cycle number, 'w': unix time the cycle started}
+      entry:  {'k': 'http'|'rpc', 'q': request key, 't': start offset in cycle, 'd': duration,
+               'r': response} or {..., 'e': error}
+    Replay matches entries by (kind, request key) in recorded order within each cycle,
+    so concurrent (async) requests may complete in any order.
+    """
+
+    def __init__(self, path, mode, timing=CASSETTE_TIMING, state_files=None, meta=None, secrets=()):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"AGENT_CASSETTE_MODE must be record or replay, got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.timing = timing
+        self.state_files = dict(state_files or {})
+        # Redacted from request keys (e.g. API keys embedded in URLs)
+        self.secrets = [s for s in secrets if s and len(s) >= 8]
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'misses': 0, 'unused': 0, 'errors': 0}
+        self.cycle = 0
+        self._cycle_wall = time.time()
+        self._cycle_real = time.monotonic()
+
+        if self.replaying:
+            self._load()
+        else:
+            self._start_recording(meta or {})
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """Cassette configured by AGENT_CASSETTE / AGENT_CASSETTE_MODE, or None"""
+        if not AGENT_CASSETTE or not AGENT_CASSETTE_MODE:
+            return None
+        return cls(AGENT_CASSETTE, AGENT_CASSETTE_MODE, **kwargs)
+
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+
+    # ==================== FILE ====================
+
+    def _start_recording(self, meta):
+        state = {}
+        for name, path in self.state_files.items():
+            try:
+                with open(path) as f:
+                    state[name] = f.read()
+            except FileNotFoundError:
+                state[name] = None
+        self.meta = meta
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._file = gzip.open(self.path, 'wt', encoding='utf-8')
+        self._write({'cassette': CASSETTE_VERSION, 'started': time.time(), 'meta': meta, 'state': state})
+        self._file.flush()
+        print(f"📼 Recording agent I/O to {self.path}")
+
+    def _write(self, obj):
+        self._file.write(json.dumps(obj, separators=(',', ':'), default=_json_default) + '\n')
+
+    def _load(self):
+        header, cycles = read_cassette(self.path)
+        self.meta = header.get('meta', {})
+        self._cycles = deque(cycles)
+        self._pending = {}
+        self._offset = 0.0
+
+        # Restore the recorded caches into a scratch dir so replay never touches live caches
+        replay_dir = tempfile.mkdtemp(prefix='neonslash-replay-')
+        for name, path in self.state_files.items():
+            self.state_files[name] = os.path.join(replay_dir, os.path.basename(path))
+            content = header.get('state', {}).get(name)
+            if content is not None:
+                with open(self.state_files[name], 'w') as f:
+                    f.write(content)
+
+        # Entries recorded before the first cycle marker (agent start-up)
+        if self._cycles and self._cycles[0][0] == 0:
+            self._enter_cycle(*self._cycles.popleft())
+        print(f"📼 Replaying {self.path}: {len(self._cycles)} cycles, timing={self.timing}")
+
+    def close(self):
+        if not self.replaying:
+            with self.lock:
+                self._file.close()
+
+    # ==================== CYCLES ====================
+
+    def _enter_cycle(self, number, wall, entries):
+        self.stats['unused'] += sum(len(q) for q in self._pending.values())
+        self.cycle = number
+        self._cycle_wall = wall
+        self._cycle_real = time.monotonic()
+        self._offset = 0.0
+        self._pending = {}
+        for entry in entries:
+            self._pending.setdefault((entry['k'], entry['q']), deque()).append(entry)
+
+    def start_cycle(self):
+        """Mark a new agent cycle. Returns False when a replay has no cycles left"""
+        with self.lock:
+            if self.replaying:
+                if not self._cycles:
+                    self._enter_cycle(self.cycle, self._cycle_wall, [])
+                    return False
+                self._enter_cycle(*self._cycles.popleft())
+                return True
+
+            self.cycle += 1
+            self._cycle_wall = time.time()
+            self._cycle_real = time.monotonic()
+            self._write({'c': self.cycle, 'w': self._cycle_wall})
+            self._file.flush()
+            return True
+
+    def end_cycle(self):
+        if not self.replaying:
+            with self.lock:
+                self._file.flush()
+
+    def report(self):
+        s = self.stats
+        return f"{s['requests']} requests, {s['errors']} recorded errors, {s['misses']} misses, {s['unused']} unused"
+
+    # ==================== CLOCK ====================
+
+    def time(self):
+        """Wall clock for the agent: the recorded time of the last replayed response"""
+        if self.replaying:
+            return self._cycle_wall + self._offset
+        return time.time()
+
+    def sleep(self, seconds, idle=False):
+        """Agent sleep; skipped when replaying fast, and for idle waits (between cycles) in any replay"""
+        if self.replaying and (idle or self.timing != 'recorded'):
+            return
+        time.sleep(seconds)
+
+    async def async_sleep(self, seconds, idle=False):
+        if self.replaying and (idle or self.timing != 'recorded'):
+            return
+        await asyncio.sleep(seconds)
+
+    # ==================== RECORD / REPLAY ====================
+
+    def http_key(self, method, url, params=None):
+        if params:
+            url += ('&' if '?' in url else '?') + urlencode(sorted(params.items()))
+        for secret in self.secrets:
+            url = url.replace(secret, '***')
+        return f"{method.upper()} {url}"
+
+    def rpc_key(self, method, params):
+        if method in VOLATILE_RPC_METHODS:
+            return method
+        return f"{method} {json.dumps(params, separators=(',', ':'), sort_keys=True, default=_json_default)}"
+
+    def _record(self, kind, key, started, response=None, error=None):
+        entry = {'k': kind, 'q': key,
+                 't': round(started - self._cycle_real, 4), 'd': round(time.monotonic() - started, 4)}
+        if error is not None:
+            entry['e'] = f"{type(error).__name__}: {error}"
+        else:
+            entry['r'] = response
+        with self.lock:
+            self.stats['requests'] += 1
+            self._write(entry)
+
+    def _take(self, kind, key):
+        """Next recorded entry for key. Returns (entry, seconds to wait before releasing it)"""
+        with self.lock:
+            queue = self._pending.get((kind, key))
+            if not queue:
+                self.stats['misses'] += 1
+                raise CassetteMiss(f"cycle {self.cycle}: no recorded {kind} response for {key}")
+            entry = queue.popleft()
+            self.stats['requests'] += 1
+            done = entry['t'] + entry['d']
+            self._offset = max(self._offset, done)
+        delay = 0.0
+        if self.timing == 'recorded':
+            delay = self._cycle_real + done - time.monotonic()
+        return entry, delay
+
+    def _result(self, entry):
+        if 'e' in entry:
+            self.stats['errors'] += 1
+            raise RecordedError(entry['e'])
+        return entry['r']
+
+    def call(self, kind, key, fn):
+        """Run fn() through the cassette; fn must return a JSON-serializable response"""
+        if self.replaying:
+            entry, delay = self._take(kind, key)
+            if delay > 0:
+                time.sleep(delay)
+            return self._result(entry)
+
+        started = time.monotonic()
+        try:
+            response = fn()
+        except Exception as e:
+            self._record(kind, key, started, error=e)
+            raise
+        self._record(kind, key, started, response)
+        return response
+
+    async def acall(self, kind, key, coro_fn):
+        """Async call(): coro_fn() returns an awaitable"""
+        if self.replaying:
+            entry, delay = self._take(kind, key)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return self._result(entry)
+
+        started = time.monotonic()
+        try:
+            response = await coro_fn()
+        except Exception as e:
+            self._record(kind, key, started, error=e)
+            raise
+        self._record(kind, key, started, response)
+        return response
+
+    # ==================== ADAPTERS ====================
+
+    def session(self):
+        return CassetteSession(self)
+
+    def web3_provider(self, endpoint_uri):
+        return CassetteHTTPProvider(endpoint_uri, self)
+
+    def async_web3_provider(self, endpoint_uri):
+        return CassetteAsyncHTTPProvider(endpoint_uri, self)
+
+
+class CassetteSession(requests.Session):
+    """requests.Session whose responses go through the cassette (status + body text)"""
+
+    def __init__(self, cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def request(self, method, url, params=None, **kwargs):
+        key = self.cassette.http_key(method, url, params)
+
+        def send():
+            r = super(CassetteSession, self).request(method, url, params=params, **kwargs)
+            return [r.status_code, r.text]
+
+        status, text = self.cassette.call('http', key, send)
+        response = requests.Response()
+        response.status_code = status
+        response._content = text.encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = url
+        return response
+
+
+class CassetteHTTPProvider(Web3.HTTPProvider):
+    def __init__(self, endpoint_uri, cassette):
+        super().__init__(endpoint_uri)
+        self.cassette = cassette
+
+    def make_request(self, method, params):
+        key = self.cassette.rpc_key(method, params)
+        return self.cassette.call('rpc', key, lambda: super(CassetteHTTPProvider, self).make_request(method, params))
+
+
+class CassetteAsyncHTTPProvider(AsyncWeb3.AsyncHTTPProvider):
+    def __init__(self, endpoint_uri, cassette):
+        super().__init__(endpoint_uri)
+        self.cassette = cassette
+
+    async def make_request(self, method, params):
+        key = self.cassette.rpc_key(method, params)
+        return await self.cassette.acall(
+            'rpc', key, lambda: super(CassetteAsyncHTTPProvider, self).make_request(method, params)
+        )
+
+
+# ==================== TOOLS ====================
+
+def read_cassette(path):
+    """Returns (header, [(cycle number, cycle wall time, [entries])]); cycle 0 = before the first cycle"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('cassette') != CASSETTE_VERSION:
+            raise ValueError(f"{path} is not a version {CASSETTE_VERSION} cassette")
+        cycles = [(0, header['started'], [])]
+        try:
+            for line in f:
+                obj = json.loads(line)
+                if 'c' in obj:
+                    cycles.append((obj['c'], obj['w'], []))
+                else:
+                    cycles[-1][2].append(obj)
+        except (EOFError, ValueError):
+            pass  # truncated tail of an interrupted recording
+    if not cycles[0][2]:
+        cycles.pop(0)
+    return header, cycles
+
+
+def print_info(path):
+    """Per-cycle request counts and latency, grouped by RPC method / HTTP host"""
+    header, cycles = read_cassette(path)
+    print(f"📼 {path}  meta={header.get('meta')}")
+    for number, wall, entries in cycles:
+        span = max((e['t'] + e['d'] for e in entries), default=0)
+        print(f"\n🔄 Cycle #{number} - {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(wall))} "
+              f"- {len(entries)} requests, {span:.1f}s")
+        groups = {}
+        for e in entries:
+            target = e['q'].split(' ')[0] if e['k'] == 'rpc' else e['q'].split('/')[2]
+            row = groups.setdefault((e['k'], target), [0, 0.0, 0])
+            row[0] += 1
+            row[1] += e['d']
+            row[2] += 'e' in e
+        for (kind, target), (count, total, errors) in sorted(groups.items(), key=lambda kv: -kv[1][1]):
+            print(f"   {kind:4} {target:40} {count:5} calls  {total:8.2f}s  {errors} errors")
+
+
+def main(argv):
+    if len(argv) < 2 or argv[0] not in ('replay', 'info'):
+        print(__doc__)
+        return 1
+    command, path = argv[0], argv[1]
+    if command == 'info':
+        print_info(path)
+        return 0
+
+    # ProphetAgent reads its configuration at import time
+    os.environ['AGENT_CASSETTE'] = path
+    os.environ['AGENT_CASSETTE_MODE'] = 'replay'
+    os.environ['CASSETTE_TIMING'] = 'recorded' if '--recorded' in argv else 'fast'
+    if '--async' in argv:
+        os.environ['AGENT_MODE'] = 'async'
+    import ProphetAgent
+    agent_class = ProphetAgent.AsyncOracleAgent if ProphetAgent.AGENT_MODE == 'async' else ProphetAgent.RealOracleAgent
+    started = time.perf_counter()
+    agent = agent_class()
+    agent.run()
+    print(f"\n📼 Replay finished in {time.perf_counter() - started:.2f}s: {agent.cassette.report()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,66 +1,61 @@
-
-from web3 import Web3
 import os
+import sys
+import time
+from web3 import Web3
 from dotenv import load_dotenv
 from datetime import datetime
 
+from market_snapshot import SNAPSHOT_DIR, MarketSnapshot, sync_snapshot, summarize
+from market_reader import MarketReader
+
 load_dotenv(dotenv_path='./frontend/.env.local')
 
-RPC_URL = 'https://rpc.testnet.arc.network'
-CONTRACT_ADDRESS = '0x212628aA49B0F770eBc4A7abCd5F1074fb2c303E'
+RPC_URL = os.getenv('VITE_ARC_RPC_URL', 'https://rpc.testnet.arc.network')
+CONTRACT_ADDRESS = os.getenv('VITE_CONTRACT_ADDRESS', '0x212628aA49B0F770eBc4A7abCd5F1074fb2c303E').replace('"', '').replace("'", "").strip()
 
-ABI = [
-    {"inputs":[],"name":"marketCount","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},
-    {"inputs":[{"internalType":"uint256","name":"","type":"uint256"}],"name":"markets","outputs":[{"internalType":"string","name":"description","type":"string"},{"internalType":"string","name":"category","type":"string"},{"internalType":"uint256","name":"totalYes","type":"uint256"},{"internalType":"uint256","name":"totalNo","type":"uint256"},{"internalType":"bool","name":"resolved","type":"bool"},{"internalType":"bool","name":"result","type":"bool"},{"internalType":"uint256","name":"deadline","type":"uint256"},{"internalType":"bool","name":"exists","type":"bool"}],"stateMutability":"view","type":"function"}
-]
+# Usage: python check_markets.py [--offline]   (--offline = report from the local snapshot only)
 
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
-contract = w3.eth.contract(address=w3.to_checksum_address(CONTRACT_ADDRESS), abi=ABI)
 
-def check():
+def sync():
+    w3 = Web3(Web3.HTTPProvider(RPC_URL))
+    reader = MarketReader(w3, CONTRACT_ADDRESS)
+
+    started = time.perf_counter()
     try:
-        count = contract.functions.marketCount().call()
-        print(f"Total Markets: {count}")
+        stored, refreshed = sync_snapshot(reader, SNAPSHOT_DIR)
     except Exception as e:
-        print(f"Error fetching market count: {e}")
+        print(f"Error syncing snapshot: {e}")
         return
-    
-    now = datetime.now().timestamp()
-    active_count = 0
-    pending_resolution = 0
-    categories = {}
-    
-    # Scan from newest to oldest for better relevance
-    start_id = max(1, count - 100) # Only check last 100 for speed
-    for i in range(count, start_id - 1, -1):
-        try:
-            m = contract.functions.markets(i).call()
-            # The structure is: desc, cat, tYes, tNo, resolved, result, deadline, exists
-            desc, cat, tYes, tNo, resolved, result, deadline, exists = m
-            
-            if not exists: continue
-            
-            is_expired = now > deadline
-            categories[cat] = categories.get(cat, 0) + 1
-            
-            if not resolved:
-                if not is_expired:
-                    active_count += 1
-                    if active_count <= 20: 
-                        print(f"Active #{i}: {desc} ({cat}) - Deadline: {datetime.fromtimestamp(deadline)}")
-                else:
-                    pending_resolution += 1
-                    print(f"Expired/Pending #{i}: {desc} ({cat}) - Ended at: {datetime.fromtimestamp(deadline)}")
-            else:
-                pass # Already resolved
-        except Exception as e:
-            print(f"Error reading market #{i}: {e}")
-            
-    print(f"\nStats:")
-    print(f"- Total scanned (last 100): {count - start_id + 1}")
-    print(f"- Unresolved & Active: {active_count}")
-    print(f"- Unresolved & Expired (Awaiting Agent): {pending_resolution}")
-    print(f"- Categories: {categories}")
+    print(f"Snapshot synced: {stored} markets, {refreshed} open refreshed ({time.perf_counter() - started:.1f}s)")
+
+
+def report():
+    with MarketSnapshot(SNAPSHOT_DIR) as snap:
+        started = time.perf_counter()
+        stats = summarize(snap)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        updated = datetime.fromtimestamp(snap.meta['updated_at']) if snap.meta['updated_at'] else 'never'
+        print(f"\nTotal Markets: {stats['count']} (snapshot updated {updated})")
+
+        print(f"\n{'Category':<16}{'Total':>7}{'Active':>8}{'Expired':>9}{'Yes':>6}{'No':>6}{'Pool':>12}")
+        for name, c in sorted(stats['categories'].items(), key=lambda kv: -kv[1]['total']):
+            print(f"{name:<16}{c['total']:>7}{c['active']:>8}{c['expired_unresolved']:>9}"
+                  f"{c['resolved_yes']:>6}{c['resolved_no']:>6}{c['pool']:>12,}")
+
+        print(f"\nUnresolved & Expired (Awaiting Agent) by age: {stats['expired_by_age']}")
+        print(f"Pool sizes (points): {stats['pool_sizes']}")
+
+        print("\nLargest open pools:")
+        for entry in stats['largest_open']:
+            m = snap.market(entry['id'])
+            print(f"- #{m['id']} [{m['category']}] {entry['pool']:,} pts - {m['description']} "
+                  f"(Deadline: {datetime.fromtimestamp(m['deadline'])})")
+
+        print(f"\nAggregated in {elapsed_ms:.1f} ms")
+
 
 if __name__ == "__main__":
-    check()
+    if '--offline' not in sys.argv:
+        sync()
+    report()
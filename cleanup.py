@@ -4,28 +4,29 @@ import os
 import time
 from dotenv import load_dotenv
 
+from market_reader import MarketReader, MARKET_ABI
+
 load_dotenv(dotenv_path='./frontend/.env.local')
 
 RPC_URL = 'https://rpc.testnet.arc.network'
 CONTRACT_ADDRESS = os.getenv('VITE_CONTRACT_ADDRESS', '').replace('"', '').replace("'", "").strip()
 PRIVATE_KEY = os.getenv('PRIVATE_KEY', '').replace('"', '').replace("'", "").strip()
 
-ABI = [
-    {"inputs":[],"name":"marketCount","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},
-    {"inputs":[{"internalType":"uint256","name":"","type":"uint256"}],"name":"markets","outputs":[{"internalType":"string","name":"description","type":"string"},{"internalType":"string","name":"category","type":"string"},{"internalType":"uint256","name":"totalYes","type":"uint256"},{"internalType":"uint256","name":"totalNo","type":"uint256"},{"internalType":"bool","name":"resolved","type":"bool"},{"internalType":"bool","name":"result","type":"bool"},{"internalType":"uint256","name":"deadline","type":"uint256"},{"internalType":"bool","name":"exists","type":"bool"}],"stateMutability":"view","type":"function"},
+ABI = MARKET_ABI + [
     {"inputs":[{"internalType":"uint256","name":"marketId","type":"uint256"},{"internalType":"bool","name":"result","type":"bool"}],"name":"resolveMarket","outputs":[],"stateMutability":"nonpayable","type":"function"}
 ]
 
 w3 = Web3(Web3.HTTPProvider(RPC_URL))
 account = w3.eth.account.from_key(PRIVATE_KEY)
 contract = w3.eth.contract(address=w3.to_checksum_address(CONTRACT_ADDRESS), abi=ABI)
+reader = MarketReader(w3, CONTRACT_ADDRESS)
 
 def cleanup():
     count = contract.functions.marketCount().call()
     print(f"Total Markets to check: {count}")
     
     for i in range(1, count + 1):
-        m = contract.functions.markets(i).call()
+        m = reader.read(i)
         resolved = m[4]
         
         if not resolved:
@@ -4,6 +4,7 @@ pragma solidity ^0.8.24;
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/access/Ownable.sol";
 import "@openzeppelin/contracts/utils/ReentrancyGuard.sol";
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
 
 /**
  * @title NeonSlashVault (Prediction Market Edition)
@@ -17,13 +18,29 @@ contract NeonSlashVault is Ownable, ReentrancyGuard {
     uint256 public constant SECONDS_PER_DAY = 86400; // 1 point per day per USDC
     uint256 public constant LOCK_PERIOD = 30 * SECONDS_PER_DAY; // 30 days lock
     
+    /**
+     * @dev Packed into 3 slots: [totalYes|totalNo] [deadline|category|resolved|result|exists] [descriptionHash].
+     * The description text is only emitted in MarketCreated; the contract never reads it.
+     */
     struct Market {
-        string description;
+        uint128 totalYes;
+        uint128 totalNo;
+        uint64 deadline;
+        uint8 category; // index into categoryNames
+        bool resolved;
+        bool result; // true = Yes, false = No
+        bool exists;
+        bytes32 descriptionHash; // keccak256 of the MarketCreated description
+    }
+    
+    // Frontend view of a market (description text is read from MarketCreated logs)
+    struct MarketView {
+        bytes32 descriptionHash;
         string category;
         uint256 totalYes;
         uint256 totalNo;
         bool resolved;
-        bool result; // true = Yes, false = No
+        bool result;
         uint256 deadline;
         bool exists;
     }
@@ -42,6 +59,10 @@ contract NeonSlashVault is Ownable, ReentrancyGuard {
     mapping(uint256 => Market) public markets;
     uint256 public marketCount;
     
+    // Category names are stored once; markets keep a uint8 index
+    string[] public categoryNames;
+    mapping(bytes32 => uint256) private categoryIndex; // keccak256(name) => index + 1
+    
     // marketId => userAddress => UserBet
     mapping(uint256 => mapping(address => UserBet)) public userBets;
     
@@ -134,20 +155,30 @@ contract NeonSlashVault is Ownable, ReentrancyGuard {
     /**
      * @dev Prediction Market Functions
      */
-    function createMarket(string memory description, string memory category, uint256 duration) external onlyOwner {
+    function createMarket(string calldata description, string calldata category, uint256 duration) external onlyOwner {
         uint256 marketId = ++marketCount;
-        markets[marketId] = Market({
-            description: description,
-            category: category,
-            totalYes: 0,
-            totalNo: 0,
-            resolved: false,
-            result: false,
-            deadline: block.timestamp + duration,
-            exists: true
-        });
+        uint64 deadline = SafeCast.toUint64(block.timestamp + duration);
         
-        emit MarketCreated(marketId, description, category, markets[marketId].deadline);
+        // Field-by-field so the zero pool slot is never written
+        Market storage market = markets[marketId];
+        market.deadline = deadline;
+        market.category = _categoryId(category);
+        market.exists = true;
+        market.descriptionHash = keccak256(bytes(description));
+        
+        emit MarketCreated(marketId, description, category, deadline);
+    }
+    
+    function _categoryId(string calldata category) internal returns (uint8) {
+        bytes32 key = keccak256(bytes(category));
+        uint256 index = categoryIndex[key];
+        if (index == 0) {
+            categoryNames.push(category);
+            index = categoryNames.length;
+            require(index <= uint256(type(uint8).max) + 1, "Too many categories");
+            categoryIndex[key] = index;
+        }
+        return uint8(index - 1);
     }
     
     function placeBet(uint256 marketId, bool prediction, uint256 amount) external nonReentrant {
@@ -166,9 +197,9 @@ contract NeonSlashVault is Ownable, ReentrancyGuard {
         pointBalances[msg.sender] -= amount;
         
         if (prediction) {
-            market.totalYes += netBet;
+            market.totalYes += SafeCast.toUint128(netBet);
         } else {
-            market.totalNo += netBet;
+            market.totalNo += SafeCast.toUint128(netBet);
         }
         
         userBets[marketId][msg.sender] = UserBet({
@@ -202,7 +233,7 @@ contract NeonSlashVault is Ownable, ReentrancyGuard {
         
         bet.claimed = true;
         
-        uint256 totalPool = market.totalYes + market.totalNo;
+        uint256 totalPool = uint256(market.totalYes) + market.totalNo;
         uint256 winningSidePool = market.result ? market.totalYes : market.totalNo;
         
         uint256 winningAmount = (bet.amount * totalPool) / winningSidePool;
@@ -277,10 +308,28 @@ contract NeonSlashVault is Ownable, ReentrancyGuard {
         return pointBalances[user] + pendingPoints;
     }
 
-    function getAllMarkets() external view returns (Market[] memory) {
-        Market[] memory allMarkets = new Market[](marketCount);
+    function getMarket(uint256 marketId) public view returns (MarketView memory) {
+        Market storage market = markets[marketId];
+        string memory category;
+        if (market.exists) {
+            category = categoryNames[market.category];
+        }
+        return MarketView({
+            descriptionHash: market.descriptionHash,
+            category: category,
+            totalYes: market.totalYes,
+            totalNo: market.totalNo,
+            resolved: market.resolved,
+            result: market.result,
+            deadline: market.deadline,
+            exists: market.exists
+        });
+    }
+
+    function getAllMarkets() external view returns (MarketView[] memory) {
+        MarketView[] memory allMarkets = new MarketView[](marketCount);
         for (uint256 i = 1; i <= marketCount; i++) {
-            allMarkets[i - 1] = markets[i];
+            allMarkets[i - 1] = getMarket(i);
         }
         return allMarkets;
     }
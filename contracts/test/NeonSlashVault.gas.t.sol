@@ -0,0 +1,119 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.24;
+
+import "forge-std/Test.sol";
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "../NeonSlashVault.sol";
+
+contract MockUSDC is ERC20 {
+    constructor() ERC20("USD Coin", "USDC") {}
+
+    function decimals() public pure override returns (uint8) {
+        return 6;
+    }
+
+    function mint(address to, uint256 amount) external {
+        _mint(to, amount);
+    }
+}
+
+/**
+ * @dev Gas benchmarks for the market lifecycle (create, bet, resolve, claim).
+ * Only the external API shared by every Market storage layout is used, so the same
+ * file measures both layouts:
+ *   forge snapshot                 (on the old layout, writes .gas-snapshot)
+ *   forge snapshot --diff          (on the new layout, prints the before/after delta)
+ * Per-call numbers are also written to snapshots/NeonSlashVaultGasTest.json.
+ */
+contract NeonSlashVaultGasTest is Test {
+    NeonSlashVault vault;
+    MockUSDC usdc;
+
+    address alice = address(0xA11CE);
+    address bob = address(0xB0B);
+
+    string constant DESCRIPTION = "Football: Liverpool vs Manchester City (English Premier League) - Will Liverpool win?";
+
+    function setUp() public {
+        usdc = new MockUSDC();
+        vault = new NeonSlashVault(address(usdc));
+        _stake(alice, 1000e6); // 5000 points
+        _stake(bob, 1000e6);
+    }
+
+    function _stake(address user, uint256 amount) internal {
+        usdc.mint(user, amount);
+        vm.startPrank(user);
+        usdc.approve(address(vault), amount);
+        vault.stake(amount);
+        vm.stopPrank();
+    }
+
+    function _createMarket() internal {
+        vault.createMarket(DESCRIPTION, "Football", 1 days);
+    }
+
+    function _placeBets() internal {
+        vm.prank(alice);
+        vault.placeBet(1, true, 1000);
+        vm.prank(bob);
+        vault.placeBet(1, false, 1000);
+    }
+
+    function test_createMarket() public {
+        _createMarket();
+        vm.snapshotGasLastCall("createMarket_newCategory");
+
+        _createMarket();
+        vm.snapshotGasLastCall("createMarket");
+
+        assertEq(vault.marketCount(), 2);
+    }
+
+    function test_placeBet() public {
+        _createMarket();
+
+        vm.prank(alice);
+        vault.placeBet(1, true, 1000);
+        vm.snapshotGasLastCall("placeBet_firstOnSide");
+
+        vm.prank(bob);
+        vault.placeBet(1, true, 1000);
+        vm.snapshotGasLastCall("placeBet");
+
+        // 2% entry fee
+        assertEq(vault.pointBalances(alice), 4000);
+    }
+
+    function test_resolveMarket() public {
+        _createMarket();
+        _placeBets();
+        vm.warp(block.timestamp + 1 days + 1);
+
+        vault.resolveMarket(1, true);
+        vm.snapshotGasLastCall("resolveMarket");
+    }
+
+    function test_claimWinnings() public {
+        _createMarket();
+        _placeBets();
+        vm.warp(block.timestamp + 1 days + 1);
+        vault.resolveMarket(1, true);
+
+        vm.prank(alice);
+        vault.claimWinnings(1);
+        vm.snapshotGasLastCall("claimWinnings");
+
+        // Pool 1960 (2 x 980 net), minus 2% claim fee
+        assertEq(vault.pointBalances(alice), 4000 + 1921);
+    }
+
+    function test_getAllMarkets() public {
+        for (uint256 i = 0; i < 20; i++) {
+            _createMarket();
+        }
+
+        vault.getAllMarkets();
+        vm.snapshotGasLastCall("getAllMarkets_20");
+    }
+}
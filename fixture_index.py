@@ -0,0 +1,121 @@
+"""
+Fixture Index
+- Lưu mọi fixture đã tạo market: event_id + key chuẩn hóa (home|away|date) -> các market đã tạo
+- Dedupe khi tạo market là một lần lookup dict, không cần đọc chain
+"""
+import os
+import json
+import time
+from datetime import datetime, timezone
+
+from team_index import normalize_team_name
+
+FIXTURE_INDEX_FILE = os.getenv('FIXTURE_INDEX_FILE', './cache/fixture_index.json')
+FIXTURE_RETENTION_DAYS = int(os.getenv('FIXTURE_RETENTION_DAYS', '30'))
+# createMarket txs without a receipt after this long are treated as dropped
+FIXTURE_PENDING_TIMEOUT = int(os.getenv('FIXTURE_PENDING_TIMEOUT', '3600'))
+
+PENDING = 'pending'
+CONFIRMED = 'confirmed'
+
+
+class FixtureIndex:
+    """
+    events: event_id -> {'date': 'YYYY-MM-DD', 'key': fixture key,
+                         'markets': [{'tx': hash, 'created_at': ts, 'status': pending|confirmed}]}
+    keys:   fixture key -> event_id
+    A fixture is a duplicate if either its event_id or its key is already indexed, so a
+    renamed league or a re-issued event id still dedupes. Markets stay pending until their
+    createMarket receipt is seen; reverted or dropped txs are forgotten (see settle()).
+    """
+
+    def __init__(self, path=FIXTURE_INDEX_FILE):
+        self.path = path
+        self.events = {}
+        self.keys = {}
+        # False until existing on-chain markets have been imported once
+        self.seeded = False
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self.events = data.get('events', {})
+            self.keys = data.get('keys', {})
+            self.seeded = data.get('seeded', False)
+        except Exception as e:
+            print(f"   ⚠️ Could not load fixture index ({e}), starting empty")
+
+    def save(self, now=None):
+        self.prune(now)
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'events': self.events, 'keys': self.keys, 'seeded': self.seeded}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def prune(self, now=None):
+        """Forget fixtures played more than FIXTURE_RETENTION_DAYS ago"""
+        cutoff_ts = (now or time.time()) - FIXTURE_RETENTION_DAYS * 86400
+        cutoff = datetime.fromtimestamp(cutoff_ts, timezone.utc).strftime('%Y-%m-%d')
+        stale = [event_id for event_id, entry in self.events.items() if entry['date'] < cutoff]
+        for event_id in stale:
+            self.keys.pop(self.events.pop(event_id)['key'], None)
+        if stale:
+            self.dirty = True
+
+    def fixture_key(self, fixture):
+        """
+        home|away|date with normalized team names. Team ids are not used: they depend on what
+        the team index has learned so far, and the key must stay the same across cycles/processes
+        """
+        home = normalize_team_name(fixture['home'])
+        away = normalize_team_name(fixture['away'])
+        return f"{home}|{away}|{fixture['date']}"
+
+    def contains(self, fixture):
+        return str(fixture.get('event_id')) in self.events or self.fixture_key(fixture) in self.keys
+
+    def record(self, fixture, tx_hash=None, now=None):
+        """Register a market sent for fixture (pending), or found on-chain (tx_hash=None, confirmed)"""
+        event_id = str(fixture.get('event_id') or self.fixture_key(fixture))
+        key = self.fixture_key(fixture)
+        entry = self.events.setdefault(event_id, {'date': fixture['date'], 'key': key, 'markets': []})
+        entry['markets'].append({'tx': tx_hash, 'created_at': int(now or time.time()),
+                                 'status': PENDING if tx_hash else CONFIRMED})
+        self.keys[key] = event_id
+        self.dirty = True
+
+    def pending(self):
+        """[(tx_hash, created_at)] of createMarket txs not confirmed yet"""
+        return [(market['tx'], market['created_at'])
+                for entry in self.events.values() for market in entry['markets']
+                if market.get('status', CONFIRMED) == PENDING]
+
+    def settle(self, tx_hash, mined):
+        """Confirm a pending market (mined=True) or forget it (reverted/dropped) so its fixture can be retried"""
+        for event_id, entry in list(self.events.items()):
+            for market in entry['markets']:
+                if market['tx'] != tx_hash:
+                    continue
+                if mined:
+                    market['status'] = CONFIRMED
+                else:
+                    entry['markets'].remove(market)
+                    if not entry['markets']:
+                        del self.events[event_id]
+                        if self.keys.get(entry['key']) == event_id:
+                            del self.keys[entry['key']]
+                self.dirty = True
+                return
+
+    def mark_seeded(self):
+        self.seeded = True
+        self.dirty = True
@@ -1,9 +1,10 @@
-import { useState, useEffect, useCallback } from 'react'
+import { useState, useEffect, useCallback, useRef } from 'react'
 import { 
   useAccount, 
   useReadContract, 
   useWriteContract, 
   useChainId,
+  usePublicClient,
 } from 'wagmi'
 import { ConnectButton } from '@rainbow-me/rainbowkit'
 import { motion, AnimatePresence } from 'framer-motion'
@@ -22,7 +23,88 @@ import {
   Loader2,
   History as HistoryIcon
 } from 'lucide-react'
-import { ARC_ID, VAULT_ADDRESS, VAULT_ABI } from '../constants'
+import { ARC_ID, VAULT_ADDRESS, VAULT_ABI, VAULT_DEPLOY_BLOCK } from '../constants'
+
+// --- HOOKS ---
+// Public RPCs reject eth_getLogs over large ranges, so MarketCreated is read in bounded chunks
+const LOG_CHUNK_BLOCKS = 5000n
+const DESCRIPTIONS_CACHE_KEY = `neon_market_descriptions_${VAULT_ADDRESS.toLowerCase()}`
+
+// Scanned block range [from, to] (bigints as strings) and the descriptions found in it
+type DescriptionCache = { from: string, to: string, descriptions: Record<number, string> }
+
+const loadDescriptionCache = (): DescriptionCache | null => {
+  try {
+    const raw = localStorage.getItem(DESCRIPTIONS_CACHE_KEY)
+    return raw ? JSON.parse(raw) : null
+  } catch {
+    return null
+  }
+}
+
+/**
+ * Market descriptions (market id -> text) from MarketCreated logs, cached in localStorage.
+ * Blocks after the cached range are read forward to the head; older blocks are read
+ * newest-first only while a market id up to marketCount still has no description.
+ */
+const useMarketDescriptions = (marketCount: number, enabled: boolean) => {
+  const publicClient = usePublicClient()
+  const cacheRef = useRef<DescriptionCache | null>(null)
+  if (cacheRef.current === null) cacheRef.current = loadDescriptionCache()
+  const [descriptions, setDescriptions] = useState<Record<number, string>>(cacheRef.current?.descriptions ?? {})
+
+  useEffect(() => {
+    if (!publicClient || !enabled || marketCount === 0) return
+    let cancelled = false
+
+    const sync = async () => {
+      const head = await publicClient.getBlockNumber()
+      const cache = cacheRef.current
+      const found: Record<number, string> = { ...(cache?.descriptions ?? {}) }
+      let from = cache ? BigInt(cache.from) : head + 1n
+      let to = cache ? BigInt(cache.to) : head
+
+      const readRange = async (fromBlock: bigint, toBlock: bigint) => {
+        const logs = await publicClient.getContractEvents({ address: VAULT_ADDRESS as `0x${string}`, abi: VAULT_ABI, eventName: 'MarketCreated', fromBlock, toBlock })
+        for (const log of logs as any[]) found[Number(log.args.marketId)] = log.args.description ?? ''
+      }
+      const commit = () => {
+        if (cancelled) return
+        cacheRef.current = { from: from.toString(), to: to.toString(), descriptions: found }
+        setDescriptions({ ...found })
+        try {
+          localStorage.setItem(DESCRIPTIONS_CACHE_KEY, JSON.stringify(cacheRef.current))
+        } catch {
+          // Storage full or disabled: keep the in-memory cache only
+        }
+      }
+      const hasMissing = () => {
+        for (let id = 1; id <= marketCount; id++) if (!(id in found)) return true
+        return false
+      }
+
+      // 1. New blocks since the last scan
+      while (to < head && !cancelled) {
+        const end = to + LOG_CHUNK_BLOCKS < head ? to + LOG_CHUNK_BLOCKS : head
+        await readRange(to + 1n, end)
+        to = end
+        commit()
+      }
+      // 2. Older blocks, newest first, until every market has its description
+      while (from > VAULT_DEPLOY_BLOCK && hasMissing() && !cancelled) {
+        const start = from - LOG_CHUNK_BLOCKS > VAULT_DEPLOY_BLOCK ? from - LOG_CHUNK_BLOCKS : VAULT_DEPLOY_BLOCK
+        await readRange(start, from - 1n)
+        from = start
+        commit()
+      }
+    }
+
+    sync().catch(err => console.warn("Market description logs unavailable:", err))
+    return () => { cancelled = true }
+  }, [publicClient, enabled, marketCount])
+
+  return descriptions
+}
 
 // --- COMPONENTS ---
 const ClaimButton = ({ marketId, marketResult, showNotification, refetchMarkets }: any) => {
@@ -326,7 +408,14 @@ const Dashboard = ({ onNavigate }: { onNavigate?: (view: string) => void }) => {
   }, [])
 
   const { data: pointsRaw } = useReadContract({ address: VAULT_ADDRESS as `0x${string}`, abi: VAULT_ABI, functionName: 'getPoints', args: address ? [address] : undefined, query: { enabled: !!address && !isNotOnArc } })
-  const { data: markets, refetch: refetchMarkets } = useReadContract({ address: VAULT_ADDRESS as `0x${string}`, abi: VAULT_ABI, functionName: 'getAllMarkets', query: { enabled: !isNotOnArc } })
+  const { data: rawMarkets, refetch: refetchMarkets } = useReadContract({ address: VAULT_ADDRESS as `0x${string}`, abi: VAULT_ABI, functionName: 'getAllMarkets', query: { enabled: !isNotOnArc } })
+
+  // Descriptions are not stored on-chain: read them from MarketCreated logs
+  const marketCount = rawMarkets ? (rawMarkets as any[]).length : 0
+  const descriptions = useMarketDescriptions(marketCount, !isNotOnArc)
+
+  // Until its log has been read, a market is titled by its id
+  const markets = rawMarkets ? (rawMarkets as any[]).map((m, idx) => ({ ...m, description: descriptions[idx + 1] ?? `Market #${idx + 1}` })) : undefined
 
   // Main Market Grid: Show only active (not resolved and not expired)
   const activeMarkets = markets ? (markets as any[]).map((m, idx) => ({ ...m, id: idx + 1 })).filter(m => {
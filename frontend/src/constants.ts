@@ -2,6 +2,10 @@ export const ARC_ID = 5042002
 export const VAULT_ADDRESS = '0x212628aA49B0F770eBc4A7abCd5F1074fb2c303E'
 export const NFT_ADDRESS = '0x0987B4b98bAa068132F632B4445e791429e84861'
 export const USDC_ADDRESS = '0x3600000000000000000000000000000000000000'
+// Block the vault was deployed at (update on redeploy): MarketCreated logs / descriptions are read from here
+// getAllMarkets + MarketCreated decode on both Market layouts: on a v1 deployment the description
+// offset lands in descriptionHash, which the UI never reads (titles always come from the logs)
+export const VAULT_DEPLOY_BLOCK = 25984343n
 
 export const USDC_ABI = [
       { "inputs": [{ "internalType": "address", "name": "owner", "type": "address" }, { "internalType": "address", "name": "spender", "type": "address" }], "name": "allowance", "outputs": [{ "internalType": "uint256", "name": "", "type": "uint256" }], "stateMutability": "view", "type": "function" },
@@ -16,10 +20,13 @@ export const VAULT_ABI = [
       { "inputs": [{ "internalType": "uint256", "name": "marketId", "type": "uint256" }, { "internalType": "bool", "name": "prediction", "type": "bool" }, { "internalType": "uint256", "name": "amount", "type": "uint256" }], "name": "placeBet", "outputs": [], "stateMutability": "nonpayable", "type": "function" },
       { "inputs": [{ "internalType": "uint256", "name": "marketId", "type": "uint256" }], "name": "claimWinnings", "outputs": [], "stateMutability": "nonpayable", "type": "function" },
       { "inputs": [], "name": "marketCount", "outputs": [{ "internalType": "uint256", "name": "", "type": "uint256" }], "stateMutability": "view", "type": "function" },
-      { "inputs": [{ "internalType": "uint256", "name": "", "type": "uint256" }], "name": "markets", "outputs": [{ "internalType": "string", "name": "description", "type": "string" }, { "internalType": "string", "name": "category", "type": "string" }, { "internalType": "uint256", "name": "totalYes", "type": "uint256" }, { "internalType": "uint256", "name": "totalNo", "type": "uint256" }, { "internalType": "bool", "name": "resolved", "type": "bool" }, { "internalType": "bool", "name": "result", "type": "bool" }, { "internalType": "uint256", "name": "deadline", "type": "uint256" }, { "internalType": "bool", "name": "exists", "type": "bool" }], "stateMutability": "view", "type": "function" },
+      { "inputs": [{ "internalType": "uint256", "name": "", "type": "uint256" }], "name": "markets", "outputs": [{ "internalType": "uint128", "name": "totalYes", "type": "uint128" }, { "internalType": "uint128", "name": "totalNo", "type": "uint128" }, { "internalType": "uint64", "name": "deadline", "type": "uint64" }, { "internalType": "uint8", "name": "category", "type": "uint8" }, { "internalType": "bool", "name": "resolved", "type": "bool" }, { "internalType": "bool", "name": "result", "type": "bool" }, { "internalType": "bool", "name": "exists", "type": "bool" }, { "internalType": "bytes32", "name": "descriptionHash", "type": "bytes32" }], "stateMutability": "view", "type": "function" },
+      { "inputs": [{ "internalType": "uint256", "name": "", "type": "uint256" }], "name": "categoryNames", "outputs": [{ "internalType": "string", "name": "", "type": "string" }], "stateMutability": "view", "type": "function" },
       { "inputs": [{ "internalType": "uint256", "name": "marketId", "type": "uint256" }, { "internalType": "address", "name": "", "type": "address" }], "name": "userBets", "outputs": [{ "internalType": "uint256", "name": "amount", "type": "uint256" }, { "internalType": "bool", "name": "prediction", "type": "bool" }, { "internalType": "bool", "name": "claimed", "type": "bool" }], "stateMutability": "view", "type": "function" },
       { "inputs": [{ "internalType": "string", "name": "description", "type": "string" }, { "internalType": "string", "name": "category", "type": "string" }, { "internalType": "uint256", "name": "duration", "type": "uint256" }], "name": "createMarket", "outputs": [], "stateMutability": "nonpayable", "type": "function" },
-      { "inputs": [], "name": "getAllMarkets", "outputs": [{ "components": [{ "internalType": "string", "name": "description", "type": "string" }, { "internalType": "string", "name": "category", "type": "string" }, { "internalType": "uint256", "name": "totalYes", "type": "uint256" }, { "internalType": "uint256", "name": "totalNo", "type": "uint256" }, { "internalType": "bool", "name": "resolved", "type": "bool" }, { "internalType": "bool", "name": "result", "type": "bool" }, { "internalType": "uint256", "name": "deadline", "type": "uint256" }, { "internalType": "bool", "name": "exists", "type": "bool" }], "internalType": "struct NeonSlashVault.Market[]", "name": "", "type": "tuple[]" }], "stateMutability": "view", "type": "function" },
+      { "inputs": [], "name": "getAllMarkets", "outputs": [{ "components": [{ "internalType": "bytes32", "name": "descriptionHash", "type": "bytes32" }, { "internalType": "string", "name": "category", "type": "string" }, { "internalType": "uint256", "name": "totalYes", "type": "uint256" }, { "internalType": "uint256", "name": "totalNo", "type": "uint256" }, { "internalType": "bool", "name": "resolved", "type": "bool" }, { "internalType": "bool", "name": "result", "type": "bool" }, { "internalType": "uint256", "name": "deadline", "type": "uint256" }, { "internalType": "bool", "name": "exists", "type": "bool" }], "internalType": "struct NeonSlashVault.MarketView[]", "name": "", "type": "tuple[]" }], "stateMutability": "view", "type": "function" },
+      { "inputs": [{ "internalType": "uint256", "name": "marketId", "type": "uint256" }], "name": "getMarket", "outputs": [{ "components": [{ "internalType": "bytes32", "name": "descriptionHash", "type": "bytes32" }, { "internalType": "string", "name": "category", "type": "string" }, { "internalType": "uint256", "name": "totalYes", "type": "uint256" }, { "internalType": "uint256", "name": "totalNo", "type": "uint256" }, { "internalType": "bool", "name": "resolved", "type": "bool" }, { "internalType": "bool", "name": "result", "type": "bool" }, { "internalType": "uint256", "name": "deadline", "type": "uint256" }, { "internalType": "bool", "name": "exists", "type": "bool" }], "internalType": "struct NeonSlashVault.MarketView", "name": "", "type": "tuple" }], "stateMutability": "view", "type": "function" },
+      { "anonymous": false, "inputs": [{ "indexed": true, "internalType": "uint256", "name": "marketId", "type": "uint256" }, { "indexed": false, "internalType": "string", "name": "description", "type": "string" }, { "indexed": false, "internalType": "string", "name": "category", "type": "string" }, { "indexed": false, "internalType": "uint256", "name": "deadline", "type": "uint256" }], "name": "MarketCreated", "type": "event" },
       { "inputs": [], "name": "owner", "outputs": [{ "internalType": "address", "name": "", "type": "address" }], "stateMutability": "view", "type": "function" },
       { "inputs": [{ "internalType": "address", "name": "", "type": "address" }], "name": "pointBalances", "outputs": [{ "internalType": "uint256", "name": "", "type": "uint256" }], "stateMutability": "view", "type": "function" },
       { "inputs": [{ "internalType": "address", "name": "", "type": "address" }], "name": "lastClaimTimestamp", "outputs": [{ "internalType": "uint256", "name": "", "type": "uint256" }], "stateMutability": "view", "type": "function" },
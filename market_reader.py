@@ -0,0 +1,161 @@
+"""
+Market Reader
+- Đọc market theo đúng layout của NeonSlashVault đang deploy:
+  v1 = markets(i) trả về cả description, v2 = getMarket(i) + description lấy từ log MarketCreated
+- Layout được dò từ contract nên code Python không lệch với contract sau khi redeploy
+- Description của v2 được index theo từng block range (incremental), cache ra JSON
+"""
+import os
+import json
+import threading
+
+from web3 import Web3
+
+from bet_aggregator import VAULT_DEPLOY_BLOCK, LOG_CHUNK_BLOCKS
+
+DESCRIPTIONS_FILE = os.getenv('MARKET_DESCRIPTIONS_FILE', './cache/market_descriptions.json')
+# Log ranges read per refresh, so a cold cache catches up over a few calls instead of blocking
+REFRESH_MAX_CHUNKS = int(os.getenv('MARKET_DESCRIPTIONS_MAX_CHUNKS', '200'))
+
+LAYOUT_V1 = 1  # struct Market {string description; string category; uint256 ...}
+LAYOUT_V2 = 2  # packed Market + bytes32 descriptionHash, read through getMarket()
+
+_MARKET_VIEW = [
+    {"internalType":"bytes32","name":"descriptionHash","type":"bytes32"},
+    {"internalType":"string","name":"category","type":"string"},
+    {"internalType":"uint256","name":"totalYes","type":"uint256"},
+    {"internalType":"uint256","name":"totalNo","type":"uint256"},
+    {"internalType":"bool","name":"resolved","type":"bool"},
+    {"internalType":"bool","name":"result","type":"bool"},
+    {"internalType":"uint256","name":"deadline","type":"uint256"},
+    {"internalType":"bool","name":"exists","type":"bool"}
+]
+
+MARKET_ABI = [
+    {"inputs":[],"name":"marketCount","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},
+    # v1 public getter
+    {"inputs":[{"internalType":"uint256","name":"","type":"uint256"}],"name":"markets","outputs":[{"internalType":"string","name":"description","type":"string"},{"internalType":"string","name":"category","type":"string"},{"internalType":"uint256","name":"totalYes","type":"uint256"},{"internalType":"uint256","name":"totalNo","type":"uint256"},{"internalType":"bool","name":"resolved","type":"bool"},{"internalType":"bool","name":"result","type":"bool"},{"internalType":"uint256","name":"deadline","type":"uint256"},{"internalType":"bool","name":"exists","type":"bool"}],"stateMutability":"view","type":"function"},
+    # v2
+    {"inputs":[{"internalType":"uint256","name":"marketId","type":"uint256"}],"name":"getMarket","outputs":[{"components":_MARKET_VIEW,"internalType":"struct NeonSlashVault.MarketView","name":"","type":"tuple"}],"stateMutability":"view","type":"function"},
+    # Same event in both layouts
+    {"anonymous":False,"inputs":[{"indexed":True,"internalType":"uint256","name":"marketId","type":"uint256"},{"indexed":False,"internalType":"string","name":"description","type":"string"},{"indexed":False,"internalType":"string","name":"category","type":"string"},{"indexed":False,"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"MarketCreated","type":"event"}
+]
+
+
+class MarketReader:
+    """
+    Reads markets as v1-shaped rows
+    (description, category, totalYes, totalNo, resolved, result, deadline, exists)
+    whatever layout the deployed contract has.
+    """
+
+    def __init__(self, w3, contract_address, path=DESCRIPTIONS_FILE):
+        self.w3 = w3
+        self.path = path
+        self.contract = w3.eth.contract(address=w3.to_checksum_address(contract_address), abi=MARKET_ABI)
+        self.address = self.contract.address
+        self.layout = None
+        self.lock = threading.Lock()
+
+        self.last_block = VAULT_DEPLOY_BLOCK - 1
+        self.head = None  # chain head seen by the last refresh
+        self.descriptions = {}  # market_id -> description (v2 only)
+        self.load()
+
+    # ==================== PERSISTENCE ====================
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get('contract', '').lower() != self.address.lower():
+                return
+            self.last_block = data['last_block']
+            self.descriptions = {int(k): v for k, v in data['descriptions'].items()}
+        except Exception as e:
+            print(f"   ⚠️ Could not load market descriptions ({e}), rebuilding")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'contract': self.address, 'last_block': self.last_block, 'descriptions': self.descriptions}, f)
+        os.replace(tmp_path, self.path)
+
+    # ==================== LAYOUT ====================
+
+    def detect_layout(self):
+        """
+        v1 has no getMarket (the call reverts); v2 getMarket(0) returns an empty view.
+        If neither call decodes (RPC down), nothing is cached and the next read retries.
+        """
+        if self.layout is not None:
+            return self.layout
+        fns = self.contract.functions
+        try:
+            fns.getMarket(0).call()
+            self.layout = LAYOUT_V2
+        except Exception:
+            fns.markets(0).call()
+            self.layout = LAYOUT_V1
+        print(f"📐 Market layout: v{self.layout} ({self.address})")
+        return self.layout
+
+    # ==================== DESCRIPTIONS (v2) ====================
+
+    def refresh(self, max_chunks=REFRESH_MAX_CHUNKS):
+        """
+        Index MarketCreated logs up to the chain head, at most max_chunks log ranges (v2 only)
+        Returns: RPC calls made (block number + one eth_getLogs per range)
+        """
+        if self.detect_layout() != LAYOUT_V2:
+            return 0
+        with self.lock:
+            head = self.head = self.w3.eth.block_number
+            calls = 1
+            for _ in range(max_chunks):
+                if self.last_block >= head:
+                    break
+                from_block = self.last_block + 1
+                to_block = min(from_block + LOG_CHUNK_BLOCKS - 1, head)
+                calls += 1
+                for event in self.contract.events.MarketCreated.get_logs(fromBlock=from_block, toBlock=to_block):
+                    self.descriptions[event['args']['marketId']] = event['args']['description']
+                self.last_block = to_block
+            if self.last_block < head:
+                print(f"   📜 Market descriptions indexed to block {self.last_block} (head {head}), continuing next refresh")
+            self.save()
+        return calls
+
+    @property
+    def caught_up(self):
+        """True once descriptions are indexed up to the head of the last refresh (always for v1)"""
+        return self.layout == LAYOUT_V1 or (self.head is not None and self.last_block >= self.head)
+
+    def description(self, market_id, description_hash):
+        """Indexed description of a v2 market, '' if unknown or not matching its on-chain hash"""
+        description = self.descriptions.get(market_id)
+        if description is None or Web3.keccak(text=description) != bytes(description_hash):
+            return ''
+        return description
+
+    # ==================== READS ====================
+
+    def market_fn(self, contract, market_id):
+        """Contract call for one market on `contract` (sync or async instance with MARKET_ABI)"""
+        if self.detect_layout() == LAYOUT_V2:
+            return contract.functions.getMarket(market_id)
+        return contract.functions.markets(market_id)
+
+    def to_row(self, market_id, raw):
+        """market_fn() result -> v1-shaped row"""
+        if self.layout == LAYOUT_V1:
+            return tuple(raw)
+        description_hash, category, total_yes, total_no, resolved, result, deadline, exists = raw
+        return (self.description(market_id, description_hash), category, total_yes, total_no,
+                resolved, result, deadline, exists)
+
+    def read(self, market_id):
+        return self.to_row(market_id, self.market_fn(self.contract, market_id).call())
@@ -0,0 +1,335 @@
+"""
+Columnar Market Snapshot
+- Mỗi field của Market là một file cột riêng (fixed-width), đọc bằng mmap
+- Description lưu dạng blob UTF-8 + cột offset, category lưu dạng dictionary code
+- Cập nhật incremental: chỉ đọc market mới + market chưa resolve qua RPC
+"""
+import os
+import sys
+import json
+import mmap
+import time
+from array import array
+
+SNAPSHOT_DIR = os.getenv('MARKET_SNAPSHOT_DIR', './snapshots/markets')
+SNAPSHOT_VERSION = 1
+
+# name -> array typecode (market id i is stored at row i - 1)
+COLUMNS = {
+    'deadline': 'Q',
+    'total_yes': 'Q',
+    'total_no': 'Q',
+    'flags': 'B',
+    'category': 'H',
+    'desc_end': 'Q',  # end offset of the description inside desc.bin
+}
+DESC_BLOB = 'desc.bin'
+META_FILE = 'meta.json'
+
+FLAG_RESOLVED = 1
+FLAG_RESULT = 2
+FLAG_EXISTS = 4
+
+# Expiry age buckets (seconds past deadline) and pool size buckets (points)
+EXPIRY_BUCKETS = [('<1h', 3600), ('1-6h', 6 * 3600), ('6-24h', 86400), ('1-7d', 7 * 86400), ('>7d', None)]
+POOL_BUCKETS = [('0', 0), ('1-99', 99), ('100-999', 999), ('1k-9.9k', 9999), ('10k+', None)]
+
+
+def _pack_flags(resolved, result, exists):
+    return (FLAG_RESOLVED if resolved else 0) | (FLAG_RESULT if result else 0) | (FLAG_EXISTS if exists else 0)
+
+
+class MarketSnapshot:
+    """
+    Read-only, memory-mapped view over a snapshot directory.
+    Columns are exposed as typed memoryviews so aggregates never copy the file.
+    """
+
+    def __init__(self, path=SNAPSHOT_DIR):
+        self.path = path
+        self._maps = []
+        self._views = []
+        self.meta = {'version': SNAPSHOT_VERSION, 'count': 0, 'categories': [], 'contract': None,
+                     'byteorder': sys.byteorder, 'updated_at': 0}
+
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+            if self.meta.get('version') != SNAPSHOT_VERSION or self.meta.get('byteorder') != sys.byteorder:
+                raise ValueError(f"Incompatible snapshot at {path} (version/byteorder mismatch)")
+
+        self.count = self.meta['count']
+        self.categories = self.meta['categories']
+        self.columns = {name: self._map(name, code) for name, code in COLUMNS.items()}
+        self.desc_blob = self._map_bytes(DESC_BLOB)
+
+    def _map_bytes(self, filename):
+        file_path = os.path.join(self.path, filename)
+        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+            return memoryview(b'')
+        with open(file_path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mm)
+        view = memoryview(mm)
+        self._views.append(view)
+        return view
+
+    def _map(self, name, code):
+        view = self._map_bytes(name + '.col')
+        itemsize = array(code).itemsize
+        # Ignore a torn tail (crash mid-append); meta count is the source of truth
+        column = view[:self.count * itemsize].cast(code)
+        self._views.append(column)
+        return column
+
+    def close(self):
+        # Views must be released before their mmap can be closed
+        for view in reversed(self._views):
+            view.release()
+        for mm in self._maps:
+            mm.close()
+        self._views = []
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def description(self, market_id):
+        row = market_id - 1
+        ends = self.columns['desc_end']
+        start = ends[row - 1] if row > 0 else 0
+        return bytes(self.desc_blob[start:ends[row]]).decode('utf-8')
+
+    def market(self, market_id):
+        row = market_id - 1
+        flags = self.columns['flags'][row]
+        return {
+            'id': market_id,
+            'description': self.description(market_id),
+            'category': self.categories[self.columns['category'][row]],
+            'totalYes': self.columns['total_yes'][row],
+            'totalNo': self.columns['total_no'][row],
+            'resolved': bool(flags & FLAG_RESOLVED),
+            'result': bool(flags & FLAG_RESULT),
+            'deadline': self.columns['deadline'][row],
+            'exists': bool(flags & FLAG_EXISTS),
+        }
+
+    def open_ids(self):
+        """Market ids that are not resolved yet (the only rows that still change on-chain)"""
+        flags = self.columns['flags']
+        return [row + 1 for row in range(self.count) if not flags[row] & FLAG_RESOLVED]
+
+
+class SnapshotWriter:
+    """
+    Appends new markets and rewrites changed rows in place.
+    Rows are written before meta.json, so a crash leaves the previous snapshot readable.
+    """
+
+    def __init__(self, path=SNAPSHOT_DIR, contract_address=None):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        with MarketSnapshot(path) as snap:
+            self.meta = dict(snap.meta)
+            last_end = snap.columns['desc_end'][snap.count - 1] if snap.count else 0
+        self.meta['categories'] = list(self.meta['categories'])
+        if contract_address:
+            if self.meta.get('contract') and self.meta['contract'].lower() != contract_address.lower():
+                raise ValueError(f"Snapshot at {path} belongs to {self.meta['contract']}, not {contract_address}")
+            self.meta['contract'] = contract_address
+        self._category_codes = {name: i for i, name in enumerate(self.meta['categories'])}
+        self._desc_end = last_end
+
+        # Truncate torn tails left by an interrupted append
+        count = self.meta['count']
+        for name, code in COLUMNS.items():
+            self._truncate(name + '.col', count * array(code).itemsize)
+        self._truncate(DESC_BLOB, last_end)
+
+    def _truncate(self, filename, size):
+        file_path = os.path.join(self.path, filename)
+        with open(file_path, 'ab') as f:
+            if f.tell() != size:
+                f.truncate(size)
+
+    def _category_code(self, category):
+        code = self._category_codes.get(category)
+        if code is None:
+            code = len(self.meta['categories'])
+            self.meta['categories'].append(category)
+            self._category_codes[category] = code
+        return code
+
+    def _row_values(self, m):
+        return {
+            'deadline': m['deadline'],
+            'total_yes': m['totalYes'],
+            'total_no': m['totalNo'],
+            'flags': _pack_flags(m['resolved'], m['result'], m['exists']),
+            'category': self._category_code(m['category']),
+        }
+
+    def append(self, markets):
+        """Append markets with ids count+1, count+2, ... (must be contiguous)"""
+        if not markets:
+            return
+        expected = self.meta['count'] + 1
+        cols = {name: array(code) for name, code in COLUMNS.items()}
+        blob = bytearray()
+        for m in markets:
+            if m['id'] != expected:
+                raise ValueError(f"Non-contiguous append: got market #{m['id']}, expected #{expected}")
+            expected += 1
+            for name, value in self._row_values(m).items():
+                cols[name].append(value)
+            blob += m['description'].encode('utf-8')
+            cols['desc_end'].append(self._desc_end + len(blob))
+
+        for name, values in cols.items():
+            with open(os.path.join(self.path, name + '.col'), 'ab') as f:
+                f.write(values.tobytes())
+        with open(os.path.join(self.path, DESC_BLOB), 'ab') as f:
+            f.write(blob)
+
+        self._desc_end += len(blob)
+        self.meta['count'] = expected - 1
+
+    def update(self, markets):
+        """Rewrite the mutable fields (pools, flags) of already stored markets in place"""
+        for name in ('total_yes', 'total_no', 'flags'):
+            code = COLUMNS[name]
+            itemsize = array(code).itemsize
+            with open(os.path.join(self.path, name + '.col'), 'r+b') as f:
+                for m in markets:
+                    f.seek((m['id'] - 1) * itemsize)
+                    f.write(array(code, [self._row_values(m)[name]]).tobytes())
+
+    def commit(self):
+        self.meta['updated_at'] = int(time.time())
+        self.meta['byteorder'] = sys.byteorder
+        tmp_path = os.path.join(self.path, META_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, os.path.join(self.path, META_FILE))
+
+
+def read_market(reader, market_id):
+    """Read one market over RPC (market_reader.MarketReader) as a dict"""
+    desc, cat, t_yes, t_no, resolved, result, deadline, exists = reader.read(market_id)
+    return {
+        'id': market_id,
+        'description': desc,
+        'category': cat,
+        'totalYes': t_yes,
+        'totalNo': t_no,
+        'resolved': resolved,
+        'result': result,
+        'deadline': deadline,
+        'exists': exists,
+    }
+
+
+def sync_snapshot(reader, path=SNAPSHOT_DIR, refresh_open=True):
+    """
+    Bring the snapshot up to date with the chain.
+    Only new markets and still-open markets are read, so a steady-state sync costs
+    (new + open) RPC calls instead of a full rescan.
+    Returns (appended, refreshed).
+    """
+    count = reader.contract.functions.marketCount().call()
+    reader.refresh()
+    writer = SnapshotWriter(path, reader.address)
+
+    refreshed = []
+    if refresh_open:
+        with MarketSnapshot(path) as snap:
+            open_ids = snap.open_ids()
+        for market_id in open_ids:
+            try:
+                refreshed.append(read_market(reader, market_id))
+            except Exception as e:
+                print(f"   ⚠️ Could not refresh market #{market_id}: {e}")
+        writer.update(refreshed)
+
+    # desc.bin is append-only: don't store blank descriptions while MarketCreated logs are still being indexed
+    if not reader.caught_up:
+        print(f"   📜 Market descriptions indexed to block {reader.last_block}, new markets appended on a later sync")
+        writer.commit()
+        return writer.meta['count'], len(refreshed)
+
+    appended = []
+    for market_id in range(writer.meta['count'] + 1, count + 1):
+        try:
+            appended.append(read_market(reader, market_id))
+        except Exception as e:
+            # Stop at the first gap so rows stay contiguous; the next sync resumes here
+            print(f"   ⚠️ Could not read market #{market_id}: {e}")
+            break
+        if len(appended) >= 500:
+            writer.append(appended)
+            writer.commit()
+            print(f"   💾 Snapshot at #{writer.meta['count']}/{count}", flush=True)
+            appended = []
+    writer.append(appended)
+    writer.commit()
+
+    return writer.meta['count'], len(refreshed)
+
+
+def _bucket(value, buckets):
+    for label, upper in buckets:
+        if upper is None or value <= upper:
+            return label
+
+
+def summarize(snap, now=None, top=10):
+    """
+    Category / expiry / pool-size aggregates in a single pass over the mapped columns
+    """
+    now = int(now if now is not None else time.time())
+    deadline = snap.columns['deadline']
+    total_yes = snap.columns['total_yes']
+    total_no = snap.columns['total_no']
+    flags = snap.columns['flags']
+    category = snap.columns['category']
+
+    per_cat = [{'total': 0, 'active': 0, 'expired_unresolved': 0, 'resolved_yes': 0, 'resolved_no': 0, 'pool': 0}
+               for _ in snap.categories]
+    expiry = {label: 0 for label, _ in EXPIRY_BUCKETS}
+    pools = {label: 0 for label, _ in POOL_BUCKETS}
+    largest_open = []  # (pool, id)
+
+    for row in range(snap.count):
+        f = flags[row]
+        if not f & FLAG_EXISTS:
+            continue
+        stats = per_cat[category[row]]
+        pool = total_yes[row] + total_no[row]
+        stats['total'] += 1
+        stats['pool'] += pool
+        pools[_bucket(pool, POOL_BUCKETS)] += 1
+
+        if f & FLAG_RESOLVED:
+            stats['resolved_yes' if f & FLAG_RESULT else 'resolved_no'] += 1
+            continue
+
+        largest_open.append((pool, row + 1))
+        if now > deadline[row]:
+            stats['expired_unresolved'] += 1
+            expiry[_bucket(now - deadline[row], EXPIRY_BUCKETS)] += 1
+        else:
+            stats['active'] += 1
+
+    largest_open.sort(reverse=True)
+    return {
+        'count': snap.count,
+        'categories': {name: per_cat[i] for i, name in enumerate(snap.categories)},
+        'expired_by_age': expiry,
+        'pool_sizes': pools,
+        'largest_open': [{'id': mid, 'pool': pool} for pool, mid in largest_open[:top]],
+    }
@@ -0,0 +1,147 @@
+"""
+Resolution Queue
+- Ưu tiên market theo giá trị: pool (totalYes + totalNo), thời gian quá hạn, oracle đã sẵn sàng chưa
+- Budget mỗi cycle (RPC calls, API credits, txs): hết budget thì phần còn lại dời sang cycle sau
+- API credits tính theo số request thật sự gửi đi (Allowance), không phải theo số market
+"""
+import os
+import math
+import heapq
+
+# Per-cycle budgets (0 = unlimited)
+CYCLE_MAX_RPC = int(os.getenv('CYCLE_MAX_RPC', '400'))
+CYCLE_MAX_API = int(os.getenv('CYCLE_MAX_API', '60'))
+CYCLE_MAX_TX = int(os.getenv('CYCLE_MAX_TX', '25'))
+# Txs the scan keeps RPC calls back for when CYCLE_MAX_TX is unlimited
+UNLIMITED_TX_RESERVE = int(os.getenv('UNLIMITED_TX_RESERVE', '25'))
+
+# Score = readiness * (1 + POOL_WEIGHT * ln(1 + pool) + OVERDUE_WEIGHT * hours overdue)
+POOL_WEIGHT = float(os.getenv('QUEUE_POOL_WEIGHT', '1.0'))
+OVERDUE_WEIGHT = float(os.getenv('QUEUE_OVERDUE_WEIGHT', '0.1'))
+MAX_OVERDUE_HOURS = 72  # older markets stop gaining priority
+
+
+def resolution_score(pool, seconds_overdue, readiness):
+    if readiness <= 0:
+        return 0.0
+    hours_overdue = min(max(seconds_overdue, 0) / 3600, MAX_OVERDUE_HOURS)
+    return readiness * (1 + POOL_WEIGHT * math.log1p(pool) + OVERDUE_WEIGHT * hours_overdue)
+
+
+class WorkBudget:
+    """Counts RPC calls, API credits and txs spent (or held) in one cycle"""
+
+    def __init__(self, rpc=CYCLE_MAX_RPC, api=CYCLE_MAX_API, tx=CYCLE_MAX_TX):
+        self.limits = {'rpc': rpc, 'api': api, 'tx': tx}
+        self.used = {'rpc': 0, 'api': 0, 'tx': 0}
+        self.held = {'rpc': 0, 'api': 0, 'tx': 0}
+
+    def can_spend(self, kind, n=1, reserve=0):
+        limit = self.limits[kind]
+        return limit <= 0 or self.used[kind] + self.held[kind] + n <= limit - reserve
+
+    def spend(self, kind, n=1, reserve=0):
+        """Spend n units of kind, keeping `reserve` units back. Returns False if over budget"""
+        if not self.can_spend(kind, n, reserve):
+            return False
+        self.used[kind] += n
+        return True
+
+    def hold(self, kind, n=1):
+        """Set n units aside for a pending decision; settle with spend_held() or release()"""
+        if not self.can_spend(kind, n):
+            return False
+        self.held[kind] += n
+        return True
+
+    def release(self, kind, n=1):
+        self.held[kind] -= n
+
+    def spend_held(self, kind, n=1):
+        self.held[kind] -= n
+        self.used[kind] += n
+
+    def charge(self, kind, n=1):
+        """Record n units that were already used, even past the limit"""
+        self.used[kind] += n
+
+    def available(self, kind, reserve=0):
+        """Units left after keeping `reserve` back, None if unlimited"""
+        limit = self.limits[kind]
+        if limit <= 0:
+            return None
+        return max(limit - reserve - self.used[kind] - self.held[kind], 0)
+
+    def rpc_reserve(self, rpc_per_tx):
+        """RPC calls the market scan must leave for sending txs (at most half the RPC budget)"""
+        txs = self.limits['tx'] if self.limits['tx'] > 0 else UNLIMITED_TX_RESERVE
+        reserve = txs * rpc_per_tx
+        if self.limits['rpc'] > 0:
+            reserve = min(reserve, self.limits['rpc'] // 2)
+        return reserve
+
+    def summary(self):
+        return ' | '.join(
+            f"{kind}: {self.used[kind]}/{self.limits[kind] or '∞'}" for kind in ('rpc', 'api', 'tx')
+        )
+
+
+class Allowance:
+    """
+    Units held from a WorkBudget for one piece of work (e.g. the worst-case API
+    requests of one oracle lookup). charge() once per request actually made,
+    close() returns whatever was not used.
+    """
+
+    def __init__(self, budget, kind, n):
+        self.budget = budget
+        self.kind = kind
+        self.left = n
+
+    def charge(self, n=1):
+        held = min(n, self.left)
+        self.budget.spend_held(self.kind, held)
+        self.budget.charge(self.kind, n - held)
+        self.left -= held
+
+    def close(self):
+        self.budget.release(self.kind, self.left)
+        self.left = 0
+
+
+class ResolutionQueue:
+    """Max-heap of resolvable markets ordered by resolution_score()"""
+
+    def __init__(self):
+        self._heap = []
+        self.not_ready = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, market_id, pool, seconds_overdue, readiness, api_cost, payload):
+        score = resolution_score(pool, seconds_overdue, readiness)
+        if score <= 0:
+            self.not_ready += 1
+            return
+        # market_id breaks ties (older first) and keeps payloads out of comparisons
+        heapq.heappush(self._heap, (-score, market_id, api_cost, payload))
+
+    def drain(self, budget):
+        """
+        Yield (market_id, score, credits, payload) best-first while the budget can hold
+        the worst-case API credits of the oracle lookup and one tx for it; the rest stays
+        queued (deferred). The consumer settles both:
+        credits (an Allowance) is charged per request and closed after the lookup,
+        the tx is budget.spend_held('tx') when the market gets a result, budget.release('tx') otherwise.
+        """
+        while self._heap:
+            _, _, api_cost, _ = self._heap[0]
+            if budget.limits['api'] > 0:
+                # A worst case above the whole budget would never be drained
+                api_cost = min(api_cost, budget.limits['api'])
+            if not budget.can_spend('api', api_cost) or not budget.hold('tx'):
+                return
+            neg_score, market_id, _, payload = heapq.heappop(self._heap)
+            budget.hold('api', api_cost)
+            yield market_id, -neg_score, Allowance(budget, 'api', api_cost), payload
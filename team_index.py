@@ -0,0 +1,191 @@
+"""
+Team Name Index
+- Map mọi biến thể tên đội (alias, viết tắt, dấu) về một team id của TheSportsDB
+- Học dần từ dữ liệu event/team mà agent đã nhận, cache ra file JSON
+- Lookup: exact alias (O(1)) -> fallback fuzzy bằng trigram (kết quả fuzzy không được lưu)
+"""
+import os
+import json
+import time
+import unicodedata
+
+TEAM_INDEX_FILE = os.getenv('TEAM_INDEX_FILE', './cache/team_index.json')
+
+# Club-type tokens that carry no identity ("AS Roma" == "Roma", "Arsenal FC" == "Arsenal")
+NOISE_TOKENS = {'fc', 'afc', 'cf', 'sc', 'ac', 'as', 'ss', 'ssc', 'us', 'cfc', 'fk', 'sv', 'club', 'calcio'}
+# Common short forms used in headlines and fixtures
+TOKEN_EXPANSIONS = {'man': 'manchester', 'utd': 'united', 'st': 'saint', 'nottm': 'nottingham'}
+
+FUZZY_MIN_SCORE = 0.75   # Dice coefficient over trigrams
+FUZZY_MIN_MARGIN = 0.1   # best must beat the runner-up (of another team) by this much
+
+
+def normalize_team_name(name):
+    """Accent-fold, lowercase, drop punctuation and club-type tokens"""
+    folded = unicodedata.normalize('NFKD', name or '')
+    folded = ''.join(c for c in folded if not unicodedata.combining(c)).lower()
+    cleaned = ''.join(c if c.isalnum() else ' ' for c in folded)
+    tokens = [TOKEN_EXPANSIONS.get(t, t) for t in cleaned.split()]
+    kept = [t for t in tokens if t not in NOISE_TOKENS]
+    return ' '.join(kept or tokens)
+
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TeamIndex:
+    """
+    Canonical teams keyed by TheSportsDB idTeam, plus a normalized alias table.
+    Also tracks markets whose team names could not be mapped, so they are skipped
+    until the index learns new teams instead of being refetched every cycle.
+    """
+
+    def __init__(self, path=TEAM_INDEX_FILE):
+        self.path = path
+        self.teams = {}      # team_id -> canonical name
+        self.aliases = {}    # normalized name -> team_id
+        self.leagues = {}    # league_id -> last seeded unix time
+        self.unmatched = {}  # market_id (str) -> {'names': [...], 'teams_seen': n}
+        self._trigram_index = {}  # trigram -> set(normalized alias), rebuilt on load
+        self._guesses = {}   # normalized name -> team_id from fuzzy matching, never persisted
+        self.dirty = False
+        self.load()
+
+    # ---------- persistence ----------
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self.teams = data.get('teams', {})
+            self.aliases = data.get('aliases', {})
+            self.leagues = data.get('leagues', {})
+            self.unmatched = data.get('unmatched', {})
+            for key in self.aliases:
+                self._index_trigrams(key)
+        except Exception as e:
+            print(f"   ⚠️ Could not load team index ({e}), starting empty")
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'teams': self.teams, 'aliases': self.aliases,
+                       'leagues': self.leagues, 'unmatched': self.unmatched}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    # ---------- learning ----------
+
+    def _index_trigrams(self, key):
+        for gram in _trigrams(key):
+            self._trigram_index.setdefault(gram, set()).add(key)
+
+    def add_alias(self, team_id, name, override=False):
+        key = normalize_team_name(name)
+        if not key or self.aliases.get(key) == team_id:
+            return
+        if key in self.aliases and not override:
+            # Never let an alternate name steal another team's alias
+            return
+        self.aliases[key] = team_id
+        self._index_trigrams(key)
+        self.dirty = True
+
+    def add_team(self, team_id, name, aliases=()):
+        if not team_id or not name:
+            return
+        team_id = str(team_id)
+        if team_id not in self.teams:
+            self.teams[team_id] = name
+            self.dirty = True
+        self.add_alias(team_id, name, override=True)
+        for alias in aliases:
+            self.add_alias(team_id, alias)
+
+    def learn_event(self, event):
+        """Register both sides of a TheSportsDB event payload"""
+        self.add_team(event.get('idHomeTeam'), event.get('strHomeTeam'))
+        self.add_team(event.get('idAwayTeam'), event.get('strAwayTeam'))
+
+    def learn_team(self, team):
+        """Register a lookup_all_teams.php team payload, including its alternate names"""
+        alternates = [a.strip() for a in (team.get('strTeamAlternate') or '').split(',') if a.strip()]
+        if team.get('strTeamShort'):
+            alternates.append(team['strTeamShort'])
+        self.add_team(team.get('idTeam'), team.get('strTeam'), alternates)
+
+    def league_is_stale(self, league_id, max_age, now=None):
+        return (now or time.time()) - self.leagues.get(league_id, 0) > max_age
+
+    def mark_league_seeded(self, league_id, now=None):
+        self.leagues[league_id] = int(now or time.time())
+        self.dirty = True
+
+    # ---------- lookup ----------
+
+    def lookup(self, name):
+        """team_id for any known variant of name, or None"""
+        key = normalize_team_name(name)
+        team_id = self.aliases.get(key) or self._guesses.get(key)
+        if team_id is not None or not key:
+            return team_id
+
+        # Fuzzy: score aliases sharing trigrams, keep the best per team
+        grams = _trigrams(key)
+        shared = {}
+        for gram in grams:
+            for alias in self._trigram_index.get(gram, ()):
+                shared[alias] = shared.get(alias, 0) + 1
+        best = {}
+        for alias, overlap in shared.items():
+            score = 2 * overlap / (len(grams) + len(_trigrams(alias)))
+            alias_team = self.aliases[alias]
+            if score > best.get(alias_team, 0):
+                best[alias_team] = score
+        ranked = sorted(best.items(), key=lambda kv: -kv[1])
+
+        team_id = None
+        if ranked and ranked[0][1] >= FUZZY_MIN_SCORE and (
+                len(ranked) == 1 or ranked[0][1] - ranked[1][1] >= FUZZY_MIN_MARGIN):
+            team_id = ranked[0][0]
+        else:
+            # Short forms ("Dortmund", "Tottenham"): all tokens inside aliases of exactly one team
+            tokens = set(key.split())
+            owners = {self.aliases[alias] for alias in shared if tokens <= set(alias.split())}
+            if len(owners) == 1:
+                team_id = owners.pop()
+        if team_id is None:
+            return None
+
+        # Fuzzy hits are only guesses: kept for this process, never in the saved alias table,
+        # so one wrong guess cannot decide every later market for that name
+        self._guesses[key] = team_id
+        print(f"   🔎 Fuzzy team match: '{name}' -> {self.teams.get(team_id, team_id)} (not saved)")
+        return team_id
+
+    def canonical(self, name):
+        """Canonical TheSportsDB name for name, or name itself if unknown"""
+        team_id = self.lookup(name)
+        return self.teams.get(team_id, name) if team_id else name
+
+    # ---------- unmatched markets ----------
+
+    def flag_unmatched(self, market_id, names):
+        self.unmatched[str(market_id)] = {'names': list(names), 'teams_seen': len(self.teams)}
+        self.dirty = True
+
+    def is_flagged(self, market_id):
+        """Flagged markets are retried only after the index has learned new teams"""
+        entry = self.unmatched.get(str(market_id))
+        return entry is not None and entry['teams_seen'] == len(self.teams)
+
+    def clear_flag(self, market_id):
+        if self.unmatched.pop(str(market_id), None) is not None:
+            self.dirty = True